@@ -2,25 +2,50 @@ import streamlit as st
 import sys
 import os
 from PIL import Image
+from dotenv import load_dotenv
+
+# Load .env before any setting is read; modules that read settings are imported lazily
+load_dotenv()
 
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.workflow import evaluate_essay
+# The LLM workflow (LangGraph, LangChain) is loaded by the background warm-up
+from src.workflow import WorkflowMode
 from src.models import EvaluationResult
+from src.warmup import start_warmup
 
 # Try to import OCR functionality
 try:
-    from src.ocr.simple_ocr import SimpleOCR
+    from src.ocr.ocr_service import get_remote_ocr
+    from src.ocr.parallel_ocr import get_parallel_ocr, get_configured_workers, get_configured_batch_size
+    # With OCR_SERVICE_ADDRESS set, OCR runs in the worker daemon (ocr_worker.py);
+    # otherwise one OCR engine per process is shared by all sessions and reruns
+    OCR_ENGINE = get_remote_ocr()
+    OCR_REMOTE = OCR_ENGINE is not None
+    if not OCR_REMOTE:
+        from src.ocr.shared_engine import get_shared_ocr
+        OCR_ENGINE = get_shared_ocr()
     OCR_AVAILABLE = True
-    # Test OCR initialization
-    _test_ocr = SimpleOCR()
-    OCR_STATUS = _test_ocr.get_status()
 except ImportError as e:
     OCR_AVAILABLE = False
-    OCR_STATUS = {}
+    OCR_ENGINE = None
+    OCR_REMOTE = False
     print(f"OCR functionality not available: {e}")
 
+# With OCR_WORKERS > 1, multi-page uploads are OCR'd by a pool of worker
+# processes, each loading its own engine
+OCR_POOL = (get_parallel_ocr(get_configured_workers())
+            if OCR_AVAILABLE and not OCR_REMOTE and get_configured_workers() > 1 else None)
+
+# Load the OCR reader(s), the LLM client and the compiled workflows in the background
+# (once per process); the worker daemon warms up its own engine
+WARMUP = start_warmup(OCR_ENGINE if OCR_AVAILABLE and not OCR_REMOTE else None, OCR_POOL)
+
+# Engine status and state ('cold', 'warming', 'ready'); never waits for the warm-up
+OCR_STATUS = OCR_ENGINE.get_status() if OCR_AVAILABLE else {}
+OCR_ENGINES_FOUND = OCR_STATUS.get('easyocr_available', False) or OCR_STATUS.get('tesseract_available', False)
+
 # Set page config
 st.set_page_config(
     page_title="UPSC Essay Evaluator",
@@ -74,6 +99,42 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Longest side of the upload previews
+PREVIEW_SIZE = 400
+
+
+def _upload_id(uploaded_file) -> str:
+    """Stable identifier of an uploaded file within the session"""
+    return getattr(uploaded_file, "file_id", None) or f"{uploaded_file.name}:{uploaded_file.size}"
+
+
+def _page_preview(uploaded_file) -> dict:
+    """Return the thumbnail and image info of an upload, decoding it only once per session"""
+    previews = st.session_state.setdefault("page_previews", {})
+    file_id = _upload_id(uploaded_file)
+    
+    if file_id not in previews:
+        image = Image.open(uploaded_file)
+        size, mode = image.size, image.mode
+        # JPEGs are decoded at reduced scale straight to thumbnail size
+        image.draft('RGB', (PREVIEW_SIZE, PREVIEW_SIZE))
+        image.thumbnail((PREVIEW_SIZE, PREVIEW_SIZE))
+        previews[file_id] = {"thumbnail": image, "size": size, "mode": mode}
+    
+    return previews[file_id]
+
+
+def _forget_other_uploads(page_set: tuple):
+    """Drop previews and OCR results of files that are no longer uploaded"""
+    previews = st.session_state.setdefault("page_previews", {})
+    for file_id in [file_id for file_id in previews if file_id not in page_set]:
+        del previews[file_id]
+    
+    ocr_results = st.session_state.setdefault("ocr_results", {})
+    for other_set in [other_set for other_set in ocr_results if other_set != page_set]:
+        del ocr_results[other_set]
+
+
 def main():
     st.markdown('<h1 class="main-header">🎓 UPSC Essay Evaluator</h1>', unsafe_allow_html=True)
     st.markdown("---")
@@ -88,6 +149,17 @@ def main():
             help="Get your API key from https://openrouter.ai/keys"
         )
         
+        evaluation_mode = st.radio(
+            "Evaluation Mode:",
+            [WorkflowMode.FANOUT, WorkflowMode.FUSED],
+            format_func=lambda mode: {
+                WorkflowMode.FANOUT: "🔀 Detailed (one call per criterion)",
+                WorkflowMode.FUSED: "⚡ Fast (single call)"
+            }[mode],
+            help="Detailed mode evaluates each criterion separately for deeper feedback. "
+                 "Fast mode evaluates everything in one call for lower latency and token cost."
+        )
+        
         st.markdown("---")
         
         # OCR Settings (only show if OCR is available)
@@ -95,7 +167,12 @@ def main():
             st.header("🔧 OCR Settings")
             
             # Show OCR status
-            if OCR_STATUS.get('easyocr_available', False):
+            ocr_state = OCR_STATUS.get('state')
+            if OCR_STATUS.get('easyocr_available', False) and ocr_state == 'warming':
+                st.info("⏳ EasyOCR: Loading models...")
+            elif OCR_STATUS.get('easyocr_available', False) and ocr_state == 'cold':
+                st.info("💤 EasyOCR: Installed (loads on first upload)")
+            elif OCR_STATUS.get('easyocr_available', False):
                 st.success("✅ EasyOCR: Ready (Recommended for handwriting)")
             else:
                 st.warning("⚠️ EasyOCR: Not available")
@@ -107,7 +184,14 @@ def main():
             else:
                 st.warning("⚠️ Tesseract: Not available or not in PATH")
             
-            if not any(OCR_STATUS.values()):
+            # Multi-page uploads use the worker processes, not the engine above
+            if OCR_POOL is not None and OCR_POOL.is_warm:
+                st.caption(f"✅ {OCR_POOL.workers} OCR worker processes: Ready")
+            elif OCR_POOL is not None:
+                st.caption(f"💤 {OCR_POOL.workers} OCR worker processes: Cold "
+                           "(multi-page uploads wait for their models to load)")
+            
+            if not OCR_ENGINES_FOUND:
                 st.error("❌ No OCR engines available")
                 st.markdown("**Quick fix (Recommended):**")
                 st.code("pip install easyocr")
@@ -124,10 +208,22 @@ def main():
             st.markdown("**Or run the installer:**")
             st.code("install_ocr_windows.bat")
             
+        # Background warm-up progress
+        if WARMUP is not None:
+            warmup_status = WARMUP.status()
+            if all(step['state'] == 'ready' for step in warmup_status.values()):
+                st.caption("🟢 Models warmed up")
+            else:
+                labels = {'ocr': "OCR reader", 'ocr_workers': "OCR worker processes",
+                          'llm': "LLM client", 'workflow': "Evaluation workflow"}
+                icons = {'pending': "⏸️", 'warming': "⏳", 'ready': "✅", 'failed': "⚠️"}
+                for name, step in warmup_status.items():
+                    st.caption(f"{icons[step['state']]} {labels.get(name, name)}: {step['state']}")
+            
         st.markdown("---")
         
         st.header("📋 Instructions")
-        if OCR_AVAILABLE and any(OCR_STATUS.values()):
+        if OCR_AVAILABLE and OCR_ENGINES_FOUND:
             st.markdown("""
             1. **Enter your OpenRouter API key** above
             2. **Choose input method:**
@@ -159,7 +255,7 @@ def main():
         - **Clarity of Thought**: Logical flow, coherence, organization
         """)
         
-        if OCR_AVAILABLE and any(OCR_STATUS.values()):
+        if OCR_AVAILABLE and OCR_ENGINES_FOUND:
             st.header("📸 Image Upload Tips")
             st.markdown("""
             - Use good lighting and avoid shadows
@@ -173,7 +269,7 @@ def main():
     st.header("✍️ Essay Input")
     
     # Input method selection (only show if OCR is available)
-    if OCR_AVAILABLE and any(OCR_STATUS.values()):
+    if OCR_AVAILABLE and OCR_ENGINES_FOUND:
         input_method = st.radio(
             "Choose input method:",
             ["✍️ Type/Paste Text", "📸 Upload Images"],
@@ -219,6 +315,12 @@ def main():
         )
         
         if uploaded_files:
+            # OCR output is kept per set of uploaded files, so reruns (including
+            # clicking "Evaluate Essay") reuse it instead of losing or redoing it
+            page_set = tuple(_upload_id(uploaded_file) for uploaded_file in uploaded_files)
+            ocr_results = st.session_state.setdefault("ocr_results", {})
+            _forget_other_uploads(page_set)
+            
             st.markdown("### 🖼️ Uploaded Images Preview")
             
             # Display uploaded images in a grid
@@ -226,50 +328,77 @@ def main():
             for i, uploaded_file in enumerate(uploaded_files):
                 with cols[i % 3]:
                     try:
-                        image = Image.open(uploaded_file)
-                        st.image(image, caption=f"Page {i+1}", use_container_width=True)
+                        st.image(_page_preview(uploaded_file)["thumbnail"], caption=f"Page {i+1}", use_container_width=True)
                     except Exception as e:
                         st.error(f"Error loading image {i+1}: {e}")
             
-            # Process images with OCR
-            if st.button("🔍 Extract Text from Images", type="secondary"):
+            # Process images with OCR; an extraction with failed pages can be run again
+            text_key = f"ocr_text_{'|'.join(page_set)}"
+            previous = ocr_results.get(page_set)
+            if st.button("🔍 Extract Text from Images", type="secondary") and (previous is None or previous["failed"]):
+                ocr_results.pop(page_set, None)
+                st.session_state.pop(text_key, None)
                 with st.spinner("🔄 Processing images and extracting text..."):
                     try:
                         # Check if we have any OCR engine available
-                        if not any(OCR_STATUS.values()):
+                        if not OCR_ENGINES_FOUND:
                             st.error("❌ No OCR engines available. Please install dependencies:")
                             st.code("pip install easyocr")
                             st.markdown("Or use the installer: `install_ocr_windows.bat`")
                             return
                         
-                        # Initialize OCR processor
-                        ocr_processor = SimpleOCR()
+                        # Use the shared, already-loaded OCR engine (or the OCR worker daemon)
+                        ocr_processor = OCR_ENGINE
                         
                         # Show processing status
                         st.write("**Processing Status:**")
                         
                         # Process each image and show progress
                         all_text_parts = []
+                        pages_with_text = 0
+                        failed_pages = 0
                         progress_bar = st.progress(0)
                         status_text = st.empty()
                         
+                        # Pages go to the OCR engines as raw upload bytes, which they
+                        # decode straight to grayscale (or find in the OCR cache)
+                        page_bytes = [uploaded_file.getvalue() for uploaded_file in uploaded_files]
+                        
+                        # With OCR_WORKERS > 1, pages are OCR'd in parallel worker processes
+                        # and their results are consumed below in page order
+                        # With OCR_BATCH_SIZE > 0, the text lines of all pages are recognized
+                        # together in shared batches instead
+                        ocr_workers = get_configured_workers()
+                        ocr_batch_size = get_configured_batch_size()
+                        parallel_pages = None
+                        if ocr_workers > 1 and len(uploaded_files) > 1 and not OCR_REMOTE:
+                            parallel_pages = OCR_POOL.iter_pages(page_bytes)
+                        elif ocr_batch_size > 0 and len(uploaded_files) > 1:
+                            status_text.text(f"Recognizing text lines of {len(uploaded_files)} images...")
+                            parallel_pages = iter([
+                                (index, text, error) for index, (text, error) in enumerate(
+                                    ocr_processor.extract_text_batch(page_bytes, batch_size=ocr_batch_size)
+                                )
+                            ])
+                        
                         for i, uploaded_file in enumerate(uploaded_files):
                             status_text.text(f"Processing image {i+1} of {len(uploaded_files)}...")
                             progress_bar.progress((i) / len(uploaded_files))
                             
                             try:
-                                # Load and display image info
-                                image = Image.open(uploaded_file)
+                                # Image info comes from the cached preview
+                                preview = _page_preview(uploaded_file)
+                                width, height = preview["size"]
                                 
                                 # Calculate megapixels for quality assessment
-                                megapixels = (image.size[0] * image.size[1]) / 1_000_000
+                                megapixels = (width * height) / 1_000_000
                                 
                                 # Show processing info
                                 with st.expander(f"📋 Image {i+1} Details", expanded=False):
                                     col1, col2 = st.columns(2)
                                     with col1:
-                                        st.write(f"**Size:** {image.size[0]} x {image.size[1]} pixels")
-                                        st.write(f"**Mode:** {image.mode}")
+                                        st.write(f"**Size:** {width} x {height} pixels")
+                                        st.write(f"**Mode:** {preview['mode']}")
                                         st.write(f"**Resolution:** {megapixels:.1f} MP")
                                     with col2:
                                         if megapixels < 2:
@@ -280,7 +409,12 @@ def main():
                                             st.success("✅ Good resolution for OCR")
                                 
                                 # Extract text from this image
-                                image_text = ocr_processor.extract_text(image)
+                                if parallel_pages is not None:
+                                    _, image_text, page_error = next(parallel_pages)
+                                    if page_error is not None:
+                                        raise RuntimeError(page_error)
+                                else:
+                                    image_text = ocr_processor.extract_text(page_bytes[i])
                                 
                                 if image_text.strip():
                                     # Count words and characters
@@ -288,6 +422,7 @@ def main():
                                     char_count = len(image_text)
                                     
                                     all_text_parts.append(f"--- Page {i+1} ---\n{image_text}")
+                                    pages_with_text += 1
                                     st.success(f"✅ Page {i+1}: {word_count} words, {char_count} characters extracted")
                                 else:
                                     all_text_parts.append(f"--- Page {i+1} ---\n[No text detected]")
@@ -295,33 +430,21 @@ def main():
                                     
                             except Exception as e:
                                 all_text_parts.append(f"--- Page {i+1} (Error) ---\nFailed to process: {str(e)}")
+                                failed_pages += 1
                                 st.error(f"❌ Page {i+1}: Processing failed - {str(e)}")
                         
                         # Complete progress
                         progress_bar.progress(1.0)
                         status_text.text("Processing complete!")
                         
-                        # Combine all extracted text
-                        extracted_text = '\n\n'.join(all_text_parts)
-                        
-                        if any("No text detected" not in part and "Failed to process" not in part for part in all_text_parts):
-                            st.success("✅ Text extraction completed!")
-                            
-                            # Show overall statistics
-                            total_words = len(' '.join(all_text_parts).split())
-                            total_chars = len(''.join(all_text_parts))
-                            st.info(f"📊 **Total extracted:** {total_words} words, {total_chars} characters")
-                            
-                            # Display extracted text in an editable text area
-                            st.markdown("### 📝 Extracted Text (You can edit if needed)")
-                            st.info("💡 **Tip:** OCR may not be 100% accurate. Please review and correct any errors before evaluation.")
-                            
-                            essay_text = st.text_area(
-                                "Review and edit the extracted text:",
-                                value=extracted_text,
-                                height=400,
-                                help="Review and edit the extracted text if needed before evaluation"
-                            )
+                        # Keep the combined text for the rest of the session; when no page
+                        # had text nothing is kept, so the button can be used to try again
+                        if pages_with_text:
+                            ocr_results[page_set] = {
+                                "text": '\n\n'.join(all_text_parts),
+                                "parts": all_text_parts,
+                                "failed": failed_pages,
+                            }
                         else:
                             st.warning("⚠️ No text was extracted from the images. Please check image quality and try again.")
                             st.markdown("""
@@ -361,6 +484,33 @@ def main():
                             with st.spinner("Installing EasyOCR..."):
                                 st.info("Installing EasyOCR via pip. This may take a few minutes...")
                                 st.warning("⚠️ Please restart the Streamlit app after installation completes.")
+            
+            # Show the extracted text on every rerun until the uploads change
+            extraction = ocr_results.get(page_set)
+            if extraction is not None:
+                all_text_parts = extraction["parts"]
+                
+                st.success("✅ Text extraction completed!")
+                if extraction["failed"]:
+                    st.warning(f"⚠️ {extraction['failed']} page(s) failed. Click 'Extract Text from Images' to try them again.")
+                
+                # Show overall statistics
+                total_words = len(' '.join(all_text_parts).split())
+                total_chars = len(''.join(all_text_parts))
+                st.info(f"📊 **Total extracted:** {total_words} words, {total_chars} characters")
+                
+                # Display extracted text in an editable text area
+                st.markdown("### 📝 Extracted Text (You can edit if needed)")
+                st.info("💡 **Tip:** OCR may not be 100% accurate. Please review and correct any errors before evaluation.")
+                
+                # Keyed by the page set so edits also survive reruns
+                essay_text = st.text_area(
+                    "Review and edit the extracted text:",
+                    value=extraction["text"],
+                    height=400,
+                    key=text_key,
+                    help="Review and edit the extracted text if needed before evaluation"
+                )
         else:
             st.info("📤 Please upload one or more images of your handwritten essay.")
             
@@ -384,12 +534,51 @@ def main():
         elif not essay_text.strip():
             st.warning("⚠️ Please enter an essay to evaluate.")
         else:
-            with st.spinner("🔄 Evaluating your essay... Please wait..."):
+            with st.spinner("🔄 Evaluating your essay... Feedback appears below as it is written."):
                 try:
+                    # Show each section's feedback while the model is still generating it
+                    live_feedback = st.empty()
+                    with live_feedback.container():
+                        st.subheader("📝 Live Feedback")
+                        placeholders = {}
+                        for field, label in [
+                            ("language_feedback", "🗣️ Language Quality Feedback"),
+                            ("analysis_feedback", "🔍 Depth of Analysis Feedback"),
+                            ("clarity_feedback", "💭 Clarity of Thought Feedback"),
+                            ("overall_feedback", "🎯 Overall Summary"),
+                        ]:
+                            with st.expander(label, expanded=True):
+                                placeholders[field] = st.empty()
+                                placeholders[field].caption("Waiting for the model...")
+                    
                     # Evaluate the essay
-                    result = evaluate_essay(essay_text, api_key)
+                    from src.workflow import stream_evaluation
+                    result = None
+                    for event, payload in stream_evaluation(essay_text, api_key, mode=evaluation_mode):
+                        if event == "partial":
+                            for field, text in payload.items():
+                                placeholders[field].markdown(text)
+                        else:
+                            result = payload
+                    
+                    # Replace the live view with the full results
+                    live_feedback.empty()
                     
-                    st.success("✅ Evaluation completed!")
+                    degraded_nodes = result.get("degraded_nodes") or []
+
+                    # No score when no criterion finished; shown as N/A, never as 0.0
+                    overall_score = "N/A" if result.get("avg_score") is None else f'{result["avg_score"]:.1f}'
+                    if result.get("avg_score") is None:
+                        st.error(
+                            "❌ No criterion finished in time, so the essay was not scored. Please try again."
+                        )
+                    elif degraded_nodes:
+                        st.warning(
+                            "⚠️ Partial evaluation: some criteria did not finish in time and were skipped "
+                            f"({', '.join(degraded_nodes)}). The overall score averages the criteria that finished."
+                        )
+                    else:
+                        st.success("✅ Evaluation completed!")
                     st.markdown("---")
                     
                     # Display results
@@ -401,7 +590,7 @@ def main():
                         st.markdown(f'''
                         <div class="metric-card">
                             <h2>Overall Score</h2>
-                            <h1>{result["avg_score"]:.1f}/10</h1>
+                            <h1>{overall_score}/10</h1>
                         </div>
                         ''', unsafe_allow_html=True)
                     
@@ -409,7 +598,12 @@ def main():
                     st.subheader("📊 Individual Scores")
                     score_col1, score_col2, score_col3 = st.columns(3)
                     
-                    scores = result["individual_scores"]
+                    # Per-criterion scores ("N/A" for criteria that missed their deadline)
+                    dimension_scores = result.get("dimension_scores") or {}
+                    scores = [
+                        dimension_scores.get(dimension, "N/A")
+                        for dimension in ("language", "analysis", "clarity")
+                    ]
                     
                     with score_col1:
                         st.markdown(f'''
@@ -478,7 +672,7 @@ def main():
 UPSC Essay Evaluation Results
 ============================
 
-Overall Score: {result["avg_score"]:.1f}/10
+Overall Score: {overall_score}/10
 
 Individual Scores:
 - Language Quality: {scores[0]}/10
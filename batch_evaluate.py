@@ -0,0 +1,83 @@
+"""
+Headless batch evaluation of UPSC essays
+
+Usage:
+    python batch_evaluate.py essays/ --output results.jsonl --concurrency 8
+    python batch_evaluate.py mock_test.jsonl --mode fused
+
+Results are appended to the output file as each essay finishes, so an
+interrupted run can be restarted with the same command and will resume
+after the last completed essay.
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Load .env before any setting is read; modules that read settings are imported lazily
+load_dotenv()
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.workflow import WorkflowMode
+from src.workflow.batch import load_essays, batch_evaluate
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Evaluate a batch of UPSC essays")
+    parser.add_argument("input", help="Directory of .txt essays or a JSONL file with 'id' and 'essay' fields")
+    parser.add_argument("--output", "-o", default="results.jsonl", help="JSONL file to write results to")
+    parser.add_argument("--concurrency", "-c", type=positive_int, default=4,
+                        help="Maximum essays evaluated at once (at least 1)")
+    parser.add_argument("--mode", choices=[mode.value for mode in WorkflowMode], default=WorkflowMode.FANOUT.value,
+                        help="Evaluation workflow mode")
+    parser.add_argument("--api-key", default=None, help="OpenRouter API key (defaults to OPENROUTER_API_KEY)")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output file instead of resuming")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    api_key = args.api_key or os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        print("❌ OpenRouter API key is required. Pass --api-key or set OPENROUTER_API_KEY.")
+        sys.exit(1)
+
+    essays = load_essays(args.input)
+    print(f"📚 Loaded {len(essays)} essays from {args.input}")
+
+    stats = batch_evaluate(
+        essays,
+        api_key,
+        args.output,
+        concurrency=args.concurrency,
+        mode=WorkflowMode(args.mode),
+        resume=not args.no_resume
+    )
+
+    print("\n📊 Batch Summary:")
+    print(f"- Evaluated: {stats['evaluated']}  Failed: {stats['failed']}  Skipped (already done): {stats['skipped']}")
+    print(f"- Elapsed: {stats['elapsed_seconds']:.1f}s  Throughput: {stats['throughput_per_minute']:.1f} essays/min")
+    print(f"- Latency p50: {stats['p50_latency_seconds']:.2f}s  p95: {stats['p95_latency_seconds']:.2f}s")
+    print(f"- Results written to {args.output}")
+
+    if stats['failed']:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark denoising strategies for OCR preprocessing
+
+Runs every DenoiseMode over a sample set of synthetic pages at several
+noise levels and reports time per page against accuracy. Accuracy is the
+share of pixels whose binarized value matches the binarized clean page,
+and, when EasyOCR is installed, the character similarity of the
+recognized text with the text of the clean page.
+
+Usage: python benchmarks/bench_denoise.py [pages_per_level]
+"""
+import sys
+import os
+import time
+import statistics
+import difflib
+
+# Add the project root to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import numpy as np
+
+from bench_preprocessing import synthetic_page
+from src.ocr.preprocessing import DenoiseMode, Preprocessor, estimate_noise
+
+try:
+    import easyocr
+    EASYOCR_AVAILABLE = True
+except ImportError:
+    EASYOCR_AVAILABLE = False
+
+
+NOISE_LEVELS = [0, 4, 8, 16, 24]
+
+
+def make_preprocessor(mode: DenoiseMode) -> Preprocessor:
+    """Build the OCRProcessor preprocessing pipeline with the given denoising strategy"""
+    return Preprocessor(min_size=0, contrast=1.0, sharpness=1.0, denoise=mode)
+
+
+def recognize(reader, page: np.ndarray) -> str:
+    """Recognize a preprocessed page with EasyOCR"""
+    return ' '.join(text for _, text, _ in reader.readtext(page, paragraph=False))
+
+
+def main(pages_per_level: int = 3):
+    print("⏱️ Denoising benchmark")
+    print("=" * 70)
+
+    reader = easyocr.Reader(['en'], gpu=False) if EASYOCR_AVAILABLE else None
+    if reader is None:
+        print("EasyOCR not installed; reporting pixel agreement only")
+
+    reference = make_preprocessor(DenoiseMode.OFF)
+    samples = []
+    for noise in NOISE_LEVELS:
+        for seed in range(pages_per_level):
+            clean = reference.run(synthetic_page(noise=0, seed=seed))
+            samples.append((noise, synthetic_page(noise=noise, seed=seed), clean))
+
+    clean_texts = {}
+    if reader is not None:
+        for index, (_, _, clean) in enumerate(samples):
+            clean_texts[index] = recognize(reader, clean)
+
+    print(f"{'mode':<10} {'noise':>5} {'sigma est':>10} {'ms/page':>9} {'pixel acc':>10} {'text acc':>9}  chosen")
+    for mode in DenoiseMode:
+        preprocessor = make_preprocessor(mode)
+
+        for noise in NOISE_LEVELS:
+            durations, pixel_accuracy, text_accuracy, sigmas, chosen = [], [], [], [], set()
+
+            for index, (level, image, clean) in enumerate(samples):
+                if level != noise:
+                    continue
+
+                gray = preprocessor.load(image)
+                chosen.add(preprocessor.choose_denoise(gray)[0].value)
+                sigmas.append(estimate_noise(gray))
+
+                start = time.perf_counter()
+                page = preprocessor.run(image)
+                durations.append((time.perf_counter() - start) * 1000)
+
+                pixel_accuracy.append(float(np.mean(page == clean)))
+                if reader is not None:
+                    text_accuracy.append(
+                        difflib.SequenceMatcher(None, recognize(reader, page), clean_texts[index]).ratio()
+                    )
+
+            text = f"{statistics.mean(text_accuracy):9.3f}" if text_accuracy else f"{'-':>9}"
+            print(f"{mode.value:<10} {noise:>5} {statistics.mean(sigmas):10.1f} "
+                  f"{statistics.mean(durations):9.1f} {statistics.mean(pixel_accuracy):10.3f} {text}  "
+                  f"{', '.join(sorted(chosen))}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 3)
@@ -0,0 +1,74 @@
+"""
+Benchmark import-time startup cost
+
+Imports each module in a fresh interpreter, so nothing is cached between
+runs, and reports the median wall time and which heavy dependencies the
+import pulled in. Heavy dependencies should only appear once an engine or
+the workflow is actually used.
+
+Usage: python benchmarks/bench_imports.py [iterations]
+"""
+import sys
+import os
+import json
+import statistics
+import subprocess
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Imports the app and CLIs perform at startup, cheapest first
+TARGETS = [
+    "src",
+    "src.ocr",
+    "src.models",
+    "src.workflow",
+    "src.ocr.shared_engine",
+    "src.models.llm_config",
+    "src.workflow.essay_workflow",
+]
+
+HEAVY_MODULES = ["torch", "easyocr", "cv2", "numpy", "PIL", "pytesseract", "tesserocr",
+                 "langgraph", "langchain_core", "langchain_openai", "pydantic"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {target}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(target: str, iterations: int) -> dict:
+    """Median import time of target across fresh interpreters, plus the heavy modules it loaded"""
+    times, loaded = [], []
+    for _ in range(iterations):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE.format(target=target, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()
+            return {"error": error[-1] if error else f"exit code {result.returncode}"}
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        times.append(sample["seconds"])
+        loaded = sample["loaded"]
+    return {"seconds": statistics.median(times), "loaded": loaded}
+
+
+def main(iterations: int = 5):
+    print("⏱️ Import-time benchmark")
+    print("=" * 50)
+    print(f"Median of {iterations} fresh interpreters per module\n")
+
+    for target in TARGETS:
+        result = measure(target, iterations)
+        if "error" in result:
+            print(f"{target:32s}   failed: {result['error']}")
+            continue
+        loaded = ", ".join(result["loaded"]) or "-"
+        print(f"{target:32s} {result['seconds'] * 1000:8.1f} ms   heavy: {loaded}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,111 @@
+"""
+Benchmark OCR image preprocessing
+
+Compares the old PIL-based enhancement (RGB upscale, PIL enhancers,
+grayscale, no-op blur, threshold and PIL round-trips) with the single-pass
+grayscale Preprocessor, reporting per-stage timings and peak memory.
+
+Usage: python benchmarks/bench_preprocessing.py [image_path] [iterations]
+"""
+import sys
+import os
+import time
+import statistics
+import tracemalloc
+
+# Add the project root to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import cv2
+import numpy as np
+from PIL import Image, ImageEnhance
+
+from src.ocr.preprocessing import Preprocessor
+
+
+def synthetic_page(width: int = 1240, height: int = 1754, noise: float = 12.0, seed: int = 0) -> Image.Image:
+    """Build an A4-like page of handwriting-sized text at 150 DPI with Gaussian noise of the given sigma"""
+    rng = np.random.default_rng(seed)
+    page = np.full((height, width, 3), 235, dtype=np.uint8)
+    for line in range(40):
+        cv2.putText(page, "The constitution reflects a balance of powers " * 2,
+                    (40, 60 + line * 40), cv2.FONT_HERSHEY_SCRIPT_SIMPLEX, 0.9, (40, 40, 40), 2)
+    page = page + rng.normal(0, noise, page.shape) if noise else page
+    return Image.fromarray(np.clip(page, 0, 255).astype(np.uint8))
+
+
+def legacy_stages(image: Image.Image, timings: dict) -> np.ndarray:
+    """The old SimpleOCR.enhance_image followed by extract_text's array conversion, timed per stage"""
+    def timed(name, func, value):
+        start = time.perf_counter()
+        result = func(value)
+        timings[name] = time.perf_counter() - start
+        return result
+
+    image = timed("to_rgb", lambda im: im.convert('RGB') if im.mode != 'RGB' else im, image)
+
+    def upscale(im):
+        width, height = im.size
+        if width < 1000 or height < 1000:
+            scale = max(1000 / width, 1000 / height)
+            return im.resize((int(width * scale), int(height * scale)), Image.Resampling.LANCZOS)
+        return im
+
+    image = timed("upscale", upscale, image)
+    image = timed("contrast", lambda im: ImageEnhance.Contrast(im).enhance(1.5), image)
+    image = timed("sharpen", lambda im: ImageEnhance.Sharpness(im).enhance(2.0), image)
+    image = timed("grayscale", lambda im: im.convert('L'), image)
+    array = timed("to_numpy", np.array, image)
+    array = timed("blur_1x1", lambda a: cv2.GaussianBlur(a, (1, 1), 0), array)
+    array = timed("threshold", lambda a: cv2.adaptiveThreshold(
+        a, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2), array)
+    image = timed("to_pil", Image.fromarray, array)
+    return timed("to_numpy_again", np.array, image)
+
+
+def measure(label: str, func, image, iterations: int):
+    """Run func repeatedly, then report mean per-stage timings and peak traced memory"""
+    stage_times = {}
+    totals = []
+    for _ in range(iterations):
+        timings = {}
+        start = time.perf_counter()
+        func(image, timings)
+        totals.append((time.perf_counter() - start) * 1000)
+        for name, seconds in timings.items():
+            stage_times.setdefault(name, []).append(seconds * 1000)
+
+    tracemalloc.start()
+    func(image, {})
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"\n{label}")
+    print("-" * 50)
+    for name, durations in stage_times.items():
+        print(f"  {name:<18} {statistics.mean(durations):8.2f} ms")
+    print(f"  {'total':<18} {statistics.mean(totals):8.2f} ms   peak memory {peak / 1_000_000:7.1f} MB")
+    return statistics.mean(totals), peak
+
+
+def main(image_path: str = None, iterations: int = 10):
+    print("⏱️ Preprocessing benchmark")
+    print("=" * 50)
+
+    image = Image.open(image_path) if image_path else synthetic_page()
+    image.load()
+    print(f"Input: {image.size[0]} x {image.size[1]} {image.mode}")
+
+    preprocessor = Preprocessor()
+    legacy_time, legacy_peak = measure("Legacy PIL pipeline", legacy_stages, image, iterations)
+    new_time, new_peak = measure("Single-pass Preprocessor", lambda im, t: preprocessor.run(im, t), image, iterations)
+
+    print(f"\nSpeedup: {legacy_time / max(new_time, 1e-9):.1f}x   "
+          f"peak memory: {legacy_peak / max(new_peak, 1):.1f}x lower")
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else None,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    )
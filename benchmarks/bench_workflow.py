@@ -0,0 +1,52 @@
+"""
+Benchmark the per-request workflow setup cost
+
+Compares rebuilding and compiling the LangGraph workflow on every request
+(the old behaviour) with fetching the cached compiled workflow.
+"""
+import sys
+import os
+import time
+import statistics
+
+# Add the project root to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.workflow import create_workflow, get_workflow, invalidate_workflow_cache
+
+
+def time_calls(func, iterations: int) -> list:
+    """Time repeated calls to func and return per-call durations in milliseconds"""
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def report(label: str, durations: list):
+    """Print summary statistics for a list of durations"""
+    print(f"{label:<28} mean {statistics.mean(durations):8.3f} ms   "
+          f"median {statistics.median(durations):8.3f} ms   "
+          f"max {max(durations):8.3f} ms")
+
+
+def main(iterations: int = 200):
+    print("⏱️ Workflow setup benchmark")
+    print("=" * 50)
+
+    rebuilt = time_calls(create_workflow, iterations)
+
+    invalidate_workflow_cache()
+    first = time_calls(get_workflow, 1)
+    cached = time_calls(get_workflow, iterations)
+
+    report("Rebuild per request:", rebuilt)
+    report("Cached (first build):", first)
+    report("Cached (warm):", cached)
+    print(f"\nSpeedup per request: {statistics.mean(rebuilt) / max(statistics.mean(cached), 1e-9):,.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
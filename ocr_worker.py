@@ -0,0 +1,47 @@
+"""
+OCR worker daemon
+
+Runs the OCR engine in its own process and serves OCR jobs over a local
+socket, so the Streamlit app does not load torch and the EasyOCR models.
+Point the app at it with OCR_SERVICE_ADDRESS.
+
+Usage:
+    python ocr_worker.py --address 127.0.0.1:8765
+    python ocr_worker.py --address unix:/tmp/upsc-ocr.sock --engine easyocr
+"""
+import argparse
+import os
+import sys
+
+from dotenv import load_dotenv
+
+# Load .env before any setting is read; OCR_* settings are read when the engine is built
+load_dotenv()
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.ocr.ocr_service import DEFAULT_ADDRESS, serve
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve OCR jobs for the UPSC Essay Evaluator")
+    parser.add_argument("--address", "-a", default=os.getenv("OCR_SERVICE_ADDRESS") or DEFAULT_ADDRESS,
+                        help="host:port or unix:/path/to/socket to listen on")
+    parser.add_argument("--engine", "-e", default="simple", choices=["simple", "easyocr", "tesseract", "tesserocr"],
+                        help="simple for SimpleOCR, or an OCRProcessor engine")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    print(f"🔍 OCR worker ({args.engine}) listening on {args.address}")
+
+    try:
+        serve(args.address, args.engine)
+    except KeyboardInterrupt:
+        print("\n👋 OCR worker stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
-from .models import *
-from .evaluators import *
-from .workflow import *
+"""
+UPSC essay evaluator
+
+Names are resolved from the models, evaluators and workflow packages on
+first access, so importing one part (e.g. src.ocr) does not pull in the
+LLM stack.
+"""
+import importlib
 
 __all__ = [
     'EvaluationSchema',
     'UPSCState',
     'EvaluationResult',
     'get_llm_model',
-    'get_structured_model',
+    'get_structured_response',
     'evaluate_language',
     'evaluate_analysis',
     'evaluate_thought',
@@ -15,3 +20,25 @@ __all__ = [
     'create_workflow',
     'evaluate_essay'
 ]
+
+# Subpackages searched in order for names not found on this package
+_SUBPACKAGES = ('models', 'evaluators', 'workflow')
+
+
+def __getattr__(name: str):
+    if name.startswith('__'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # The subpackages resolve their own names lazily, so importing them is cheap
+    for subpackage in _SUBPACKAGES:
+        module = importlib.import_module(f".{subpackage}", __name__)
+        if name in module.__all__:
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,11 +1,29 @@
-from .language_evaluator import evaluate_language
-from .analysis_evaluator import evaluate_analysis
-from .clarity_evaluator import evaluate_thought
-from .final_evaluator import final_evaluation
-
-__all__ = [
-    'evaluate_language',
-    'evaluate_analysis', 
-    'evaluate_thought',
-    'final_evaluation'
-]
+import importlib
+
+# Public name -> submodule defining it; submodules are imported on first access
+_EXPORTS = {
+    'evaluate_language': 'language_evaluator',
+    'evaluate_analysis': 'analysis_evaluator',
+    'evaluate_thought': 'clarity_evaluator',
+    'final_evaluation': 'final_evaluator',
+    'evaluate_fused': 'fused_evaluator',
+    'aevaluate_language': 'language_evaluator',
+    'aevaluate_analysis': 'analysis_evaluator',
+    'aevaluate_thought': 'clarity_evaluator',
+    'afinal_evaluation': 'final_evaluator',
+    'aevaluate_fused': 'fused_evaluator'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,11 +1,41 @@
-from ..models import UPSCState, get_llm_model, get_structured_response
+from ..models import UPSCState, get_llm_model, get_structured_response, aget_structured_response, cached_evaluation, with_deadline
 
 
+def _build_prompt(state: UPSCState) -> str:
+    """Build the clarity of thought evaluation prompt"""
+    return f'Evaluate the clarity of thought of the following essay and provide a feedback and assign a score out of 10 \n {state["essay"]}'
+
+
+def _to_update(output: dict) -> dict:
+    """Convert a structured response into a state update"""
+    return {
+        'clarity_feedback': output['feedback'],
+        'individual_scores': [output['score']],
+        'dimension_scores': {'clarity': output['score']}
+    }
+
+
+def _degraded_update(state: UPSCState, deadline: float) -> dict:
+    """State update used when the evaluation misses its deadline"""
+    return {'clarity_feedback': f'[Clarity of thought evaluation did not finish within {deadline:.0f}s and was skipped]'}
+
+
+@cached_evaluation('evaluate_thought')
 def evaluate_thought(state: UPSCState):
     """Evaluate the clarity of thought of the essay"""
     model = get_llm_model(state["api_key"])
     
-    prompt = f'Evaluate the clarity of thought of the following essay and provide a feedback and assign a score out of 10 \n {state["essay"]}'
-    output = get_structured_response(model, prompt)
+    output = get_structured_response(model, _build_prompt(state))
+
+    return _to_update(output)
+
+
+@with_deadline('evaluate_thought', _degraded_update)
+@cached_evaluation('evaluate_thought')
+async def aevaluate_thought(state: UPSCState):
+    """Evaluate the clarity of thought of the essay without blocking the event loop"""
+    model = get_llm_model(state["api_key"])
+
+    output = await aget_structured_response(model, _build_prompt(state))
 
-    return {'clarity_feedback': output['feedback'], 'individual_scores': [output['score']]}
+    return _to_update(output)
@@ -1,14 +1,17 @@
-from ..models import UPSCState, get_llm_model
+from typing import Optional
 
+from ..models import UPSCState, get_llm_model, invoke_model, ainvoke_model, cached_evaluation, with_deadline, PRIORITY_HIGH
 
-def final_evaluation(state: UPSCState):
-    """Generate final evaluation summary and calculate average score"""
-    model = get_llm_model(state["api_key"])
-    
-    # Generate summary feedback
-    system_prompt = """You are an essay evaluator. Create a concise overall summary based on the individual feedback provided.
+
+# Generate summary feedback
+SYSTEM_PROMPT = """You are an essay evaluator. Create a concise overall summary based on the individual feedback provided.
     Focus on highlighting the key strengths and areas for improvement."""
-    
+
+SUMMARY_FIELDS = ('language_feedback', 'analysis_feedback', 'clarity_feedback', 'individual_scores')
+
+
+def _build_messages(state: UPSCState) -> list:
+    """Build the summary prompt messages"""
     prompt = f'''Based on the following detailed feedback, create a concise summary:
     
     Language Quality: {state["language_feedback"]}
@@ -16,15 +19,46 @@ def final_evaluation(state: UPSCState):
     Clarity of Thought: {state["clarity_feedback"]}
     
     Keep the summary focused on the main points and provide actionable suggestions.'''
-    
-    response = model.invoke([
-        {"role": "system", "content": system_prompt},
+
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
         {"role": "user", "content": prompt}
-    ])
+    ]
+
+
+def _average_score(state: UPSCState) -> Optional[float]:
+    """Average the scores of the dimensions that finished (None if none did)"""
+    scores = state.get('individual_scores') or []
+    return sum(scores) / len(scores) if scores else None
+
+
+def _to_update(state: UPSCState, overall_feedback: str) -> dict:
+    """Build the final state update and calculate the average score"""
+    return {'overall_feedback': overall_feedback, 'avg_score': _average_score(state)}
+
+
+def _degraded_update(state: UPSCState, deadline: float) -> dict:
+    """State update used when the summary misses its deadline"""
+    return _to_update(state, f'[Overall summary did not finish within {deadline:.0f}s and was skipped]')
+
+
+@cached_evaluation('final_evaluation', fields=SUMMARY_FIELDS)
+def final_evaluation(state: UPSCState):
+    """Generate final evaluation summary and calculate average score"""
+    model = get_llm_model(state["api_key"])
     
-    overall_feedback = response.content
+    # The summary completes an essay already in flight, so it jumps the queue
+    response = invoke_model(model, _build_messages(state), PRIORITY_HIGH)
+
+    return _to_update(state, response.content)
+
+
+@with_deadline('final_evaluation', _degraded_update)
+@cached_evaluation('final_evaluation', fields=SUMMARY_FIELDS)
+async def afinal_evaluation(state: UPSCState):
+    """Generate final evaluation summary and calculate average score without blocking the event loop"""
+    model = get_llm_model(state["api_key"])
 
-    # Calculate average score
-    avg_score = sum(state['individual_scores']) / len(state['individual_scores'])
+    response = await ainvoke_model(model, _build_messages(state), PRIORITY_HIGH)
 
-    return {'overall_feedback': overall_feedback, 'avg_score': avg_score}
+    return _to_update(state, response.content)
@@ -0,0 +1,63 @@
+from ..models import UPSCState, EvaluationResult, get_llm_model, get_fused_response, aget_fused_response, cached_evaluation, with_deadline
+
+
+def _build_prompt(state: UPSCState) -> str:
+    """Build the single-call evaluation prompt"""
+    return f'''Evaluate the following essay on three dimensions and assign each a score out of 10:
+    - Language Quality: grammar, vocabulary, sentence structure
+    - Depth of Analysis: critical thinking, evidence, arguments
+    - Clarity of Thought: logical flow, coherence, organization
+
+    Then write a concise overall summary focused on the main points with actionable suggestions.
+
+    {state["essay"]}'''
+
+
+def _to_update(output: dict) -> dict:
+    """Validate a fused response and convert it into a state update"""
+    dimension_scores = {dimension: output[dimension]['score'] for dimension in ('language', 'analysis', 'clarity')}
+    scores = list(dimension_scores.values())
+    result = EvaluationResult(
+        language_feedback=output['language']['feedback'],
+        analysis_feedback=output['analysis']['feedback'],
+        clarity_feedback=output['clarity']['feedback'],
+        overall_feedback=output['overall_feedback'],
+        individual_scores=scores,
+        avg_score=sum(scores) / len(scores),
+        dimension_scores=dimension_scores
+    )
+
+    return result.model_dump()
+
+
+def _degraded_update(state: UPSCState, deadline: float) -> dict:
+    """State update used when the single-call evaluation misses its deadline"""
+    message = f'[Evaluation did not finish within {deadline:.0f}s and was skipped]'
+    return {
+        'language_feedback': message,
+        'analysis_feedback': message,
+        'clarity_feedback': message,
+        'overall_feedback': message,
+        'avg_score': None
+    }
+
+
+@cached_evaluation('evaluate_fused')
+def evaluate_fused(state: UPSCState):
+    """Evaluate all rubric dimensions and summarise the essay in a single model call"""
+    model = get_llm_model(state["api_key"])
+
+    output = get_fused_response(model, _build_prompt(state))
+
+    return _to_update(output)
+
+
+@with_deadline('evaluate_fused', _degraded_update)
+@cached_evaluation('evaluate_fused')
+async def aevaluate_fused(state: UPSCState):
+    """Evaluate all rubric dimensions in a single model call without blocking the event loop"""
+    model = get_llm_model(state["api_key"])
+
+    output = await aget_fused_response(model, _build_prompt(state))
+
+    return _to_update(output)
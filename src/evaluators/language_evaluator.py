@@ -1,11 +1,41 @@
-from ..models import UPSCState, get_llm_model, get_structured_response
+from ..models import UPSCState, get_llm_model, get_structured_response, aget_structured_response, cached_evaluation, with_deadline
 
 
+def _build_prompt(state: UPSCState) -> str:
+    """Build the language quality evaluation prompt"""
+    return f'Evaluate the language quality of the following essay and provide a feedback and assign a score out of 10 \n {state["essay"]}'
+
+
+def _to_update(output: dict) -> dict:
+    """Convert a structured response into a state update"""
+    return {
+        'language_feedback': output['feedback'],
+        'individual_scores': [output['score']],
+        'dimension_scores': {'language': output['score']}
+    }
+
+
+def _degraded_update(state: UPSCState, deadline: float) -> dict:
+    """State update used when the evaluation misses its deadline"""
+    return {'language_feedback': f'[Language quality evaluation did not finish within {deadline:.0f}s and was skipped]'}
+
+
+@cached_evaluation('evaluate_language')
 def evaluate_language(state: UPSCState):
     """Evaluate the language quality of the essay"""
     model = get_llm_model(state["api_key"])
     
-    prompt = f'Evaluate the language quality of the following essay and provide a feedback and assign a score out of 10 \n {state["essay"]}'
-    output = get_structured_response(model, prompt)
+    output = get_structured_response(model, _build_prompt(state))
+
+    return _to_update(output)
+
+
+@with_deadline('evaluate_language', _degraded_update)
+@cached_evaluation('evaluate_language')
+async def aevaluate_language(state: UPSCState):
+    """Evaluate the language quality of the essay without blocking the event loop"""
+    model = get_llm_model(state["api_key"])
+
+    output = await aget_structured_response(model, _build_prompt(state))
 
-    return {'language_feedback': output['feedback'], 'individual_scores': [output['score']]}
+    return _to_update(output)
@@ -1,10 +1,50 @@
-from .schemas import EvaluationSchema, UPSCState, EvaluationResult
-from .llm_config import get_llm_model, get_structured_response
-
-__all__ = [
-    'EvaluationSchema',
-    'UPSCState',
-    'EvaluationResult',
-    'get_llm_model',
-    'get_structured_response'
-]
+import importlib
+
+# Public name -> submodule defining it; submodules are imported on first
+# access so the schemas can be used without loading the LLM client stack
+_EXPORTS = {
+    'EvaluationSchema': 'schemas',
+    'UPSCState': 'schemas',
+    'EvaluationResult': 'schemas',
+    'FusedEvaluationSchema': 'schemas',
+    'get_llm_model': 'llm_config',
+    'get_structured_response': 'llm_config',
+    'get_fused_response': 'llm_config',
+    'aget_structured_response': 'llm_config',
+    'aget_fused_response': 'llm_config',
+    'get_client_pool': 'llm_config',
+    'LLMClientPool': 'client_pool',
+    'get_scheduler': 'llm_config',
+    'invoke_model': 'llm_config',
+    'ainvoke_model': 'llm_config',
+    'RequestScheduler': 'scheduler',
+    'RateLimitExceeded': 'scheduler',
+    'PRIORITY_HIGH': 'scheduler',
+    'PRIORITY_NORMAL': 'scheduler',
+    'background_requests': 'scheduler',
+    'StructuredOutputError': 'structured_output',
+    'extract_json': 'structured_output',
+    'parse_structured': 'structured_output',
+    'LatencyTracker': 'hedging',
+    'get_latency_tracker': 'hedging',
+    'ahedged_call': 'hedging',
+    'with_deadline': 'hedging',
+    'EvaluationCache': 'result_cache',
+    'get_evaluation_cache': 'result_cache',
+    'cached_evaluation': 'result_cache',
+    'make_cache_key': 'result_cache'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
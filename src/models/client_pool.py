@@ -0,0 +1,90 @@
+from collections import OrderedDict
+import threading
+import time
+
+
+class LLMClientPool:
+    """
+    Bounded pool of ChatOpenAI clients shared by all evaluator nodes and sessions
+
+    Clients are keyed by API key and model settings, so every node evaluating
+    an essay with the same key reuses one client (and its HTTP connections)
+    instead of opening a new one per call.
+    """
+
+    def __init__(self, max_size: int = 8, idle_timeout: float = 600.0):
+        """
+        Initialize the client pool
+
+        Args:
+            max_size: Maximum number of clients kept alive at once
+            idle_timeout: Seconds after which an unused client is evicted
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key: str, model: str, temperature: float, base_url: str) -> "ChatOpenAI":
+        """
+        Return a pooled client for the given settings, creating it if needed
+
+        Args:
+            api_key: OpenRouter API key
+            model: Model name
+            temperature: Sampling temperature
+            base_url: API base URL
+
+        Returns:
+            Shared ChatOpenAI client
+        """
+        key = (api_key, model, temperature, base_url)
+        now = time.monotonic()
+
+        with self._lock:
+            self._evict_idle(now)
+
+            entry = self._clients.get(key)
+            if entry is not None:
+                client, _ = entry
+                self._clients[key] = (client, now)
+                self._clients.move_to_end(key)
+                return client
+
+            # langchain_openai takes about a second to import; defer it to the first client
+            from langchain_openai import ChatOpenAI
+            client = ChatOpenAI(
+                model=model,
+                temperature=temperature,
+                openai_api_key=api_key,
+                openai_api_base=base_url,
+                # Stream tokens so callers can show feedback as it is generated
+                streaming=True,
+                # Retries (rate limits, server and connection errors) are handled by the request scheduler
+                max_retries=0
+            )
+            self._clients[key] = (client, now)
+
+            # Drop the least recently used clients once the pool is full
+            while len(self._clients) > self.max_size:
+                self._clients.popitem(last=False)
+
+            return client
+
+    def _evict_idle(self, now: float):
+        """Remove clients that have not been used within the idle timeout"""
+        expired = [
+            key for key, (_, last_used) in self._clients.items()
+            if now - last_used > self.idle_timeout
+        ]
+        for key in expired:
+            del self._clients[key]
+
+    def clear(self):
+        """Drop all pooled clients"""
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
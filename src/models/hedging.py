@@ -0,0 +1,122 @@
+from collections import deque
+from functools import wraps
+import asyncio
+import os
+import threading
+import time
+
+
+class LatencyTracker:
+    """Rolling window of recent request latencies, per request kind"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initialize the tracker
+
+        Args:
+            window: Number of recent latencies kept per kind
+            min_samples: Samples required before percentiles are reported
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, latency: float):
+        """Record a latency in seconds"""
+        with self._lock:
+            self._samples.setdefault(kind, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, kind: str, pct: float):
+        """Return the pct-th percentile latency for kind, or None without enough samples"""
+        with self._lock:
+            samples = sorted(self._samples.get(kind, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+_tracker = LatencyTracker(min_samples=int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20")))
+
+# Percentile after which a duplicate request is sent (0 disables hedging)
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+
+# Seconds an evaluator node may run before a degraded result is returned
+NODE_DEADLINE_SECONDS = float(os.getenv("LLM_NODE_DEADLINE_SECONDS", "90"))
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Return the shared latency tracker"""
+    return _tracker
+
+
+async def ahedged_call(kind: str, afunc, hedge_percentile: float = None, can_hedge=None):
+    """
+    Run a request, sending one hedged duplicate if it is slower than usual
+
+    Args:
+        kind: Request kind used to look up typical latency
+        afunc: Zero-argument callable returning an awaitable request
+        hedge_percentile: Latency percentile after which the duplicate is sent
+            (defaults to LLM_HEDGE_PERCENTILE; 0 disables hedging)
+        can_hedge: Zero-argument callable checked when the duplicate is due;
+            no duplicate is sent if it returns False
+
+    Returns:
+        Result of whichever request finishes successfully first
+    """
+    if hedge_percentile is None:
+        hedge_percentile = HEDGE_PERCENTILE
+
+    hedge_after = _tracker.percentile(kind, hedge_percentile) if hedge_percentile > 0 else None
+    start = time.monotonic()
+    tasks = [asyncio.ensure_future(afunc())]
+
+    try:
+        if hedge_after is not None:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+            if not done and (can_hedge is None or can_hedge()):
+                tasks.append(asyncio.ensure_future(afunc()))
+
+        pending = set(tasks)
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    _tracker.record(kind, time.monotonic() - start)
+                    return task.result()
+                error = error or task.exception()
+
+        # Every attempt failed
+        raise error
+    finally:
+        # The first reply wins; cancel the other attempt
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def with_deadline(node_name: str, degraded_update, deadline: float = None):
+    """
+    Bound an async evaluator node by a deadline
+
+    When the node misses its deadline the in-flight request is cancelled and
+    degraded_update(state, timeout) is returned instead, with the node recorded in
+    degraded_nodes so the result is clearly marked.
+
+    Args:
+        node_name: Name recorded in degraded_nodes
+        degraded_update: Callable building the fallback state update
+        deadline: Seconds allowed (defaults to LLM_NODE_DEADLINE_SECONDS)
+    """
+    def decorator(anode):
+        @wraps(anode)
+        async def wrapper(state):
+            timeout = deadline if deadline is not None else NODE_DEADLINE_SECONDS
+            try:
+                return await asyncio.wait_for(anode(state), timeout)
+            except asyncio.TimeoutError:
+                return {**degraded_update(state, timeout), 'degraded_nodes': [node_name]}
+        return wrapper
+    return decorator
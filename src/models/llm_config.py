@@ -1,29 +1,89 @@
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 import os
 import json
+import re
+import threading
+
+from .client_pool import LLMClientPool
+from .scheduler import RequestScheduler, PRIORITY_NORMAL
+from .hedging import ahedged_call
+from .schemas import EvaluationSchema, FusedEvaluationSchema
+from .structured_output import StructuredOutputError, parse_structured, build_reask_prompt
+from ..workflow.event_loop import run_sync
 
 # Load environment variables
 load_dotenv()
 
-def get_llm_model(api_key: str = None):
-    """Initialize and return the LLM model configured for OpenRouter"""
+DEFAULT_MODEL = "mistralai/mistral-7b-instruct:free"
+DEFAULT_TEMPERATURE = 0.7
+
+# Model and temperature every evaluator uses; also part of every cache key
+MODEL_NAME = os.getenv("LLM_MODEL") or DEFAULT_MODEL
+MODEL_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", str(DEFAULT_TEMPERATURE)))
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Bump whenever an evaluator prompt changes so cached results are not reused
+PROMPT_VERSION = "3"
+
+# Process-wide client pool shared by all evaluator nodes and sessions
+_client_pool = LLMClientPool(
+    max_size=int(os.getenv("LLM_POOL_SIZE", "8")),
+    idle_timeout=float(os.getenv("LLM_POOL_IDLE_SECONDS", "600"))
+)
+
+
+# Process-wide scheduler that every LLM call goes through
+_scheduler = RequestScheduler(
+    rate=float(os.getenv("LLM_RATE_PER_SECOND", "0.5")),
+    burst=float(os.getenv("LLM_BURST", "4")),
+    max_retries=int(os.getenv("LLM_MAX_RETRIES", "3"))
+)
+
+
+def get_client_pool() -> LLMClientPool:
+    """Return the shared LLM client pool"""
+    return _client_pool
+
+
+def get_scheduler() -> RequestScheduler:
+    """Return the shared LLM request scheduler"""
+    return _scheduler
+
+
+def _api_key_of(model) -> str:
+    """Return the API key a model client bills requests to"""
+    secret = getattr(model, 'openai_api_key', None)
+    return secret.get_secret_value() if hasattr(secret, 'get_secret_value') else str(secret)
+
+
+def invoke_model(model, messages: list, priority: int = PRIORITY_NORMAL, runnable=None):
+    """Invoke the model (or a runnable built on it) through the shared rate-limit-aware scheduler"""
+    target = runnable or model
+    return _scheduler.run(_api_key_of(model), lambda: target.invoke(messages), priority)
+
+
+async def ainvoke_model(model, messages: list, priority: int = PRIORITY_NORMAL, kind: str = "chat", runnable=None):
+    """Invoke the model through the shared scheduler, hedging calls slower than usual for their kind"""
+    key = _api_key_of(model)
+    target = runnable or model
+    # Hedges only use spare rate-limit capacity, never tokens queued requests are waiting for
+    return await ahedged_call(kind, lambda: _scheduler.arun(key, lambda: target.ainvoke(messages), priority),
+                              can_hedge=lambda: _scheduler.has_spare_capacity(key))
+
+
+def get_llm_model(api_key: str = None, model: str = None, temperature: float = None):
+    """Return a pooled LLM model configured for OpenRouter (defaults to MODEL_NAME and MODEL_TEMPERATURE)"""
     # Use provided API key or fall back to environment variable
     openrouter_api_key = api_key or os.getenv("OPENROUTER_API_KEY")
     
     if not openrouter_api_key:
         raise ValueError("OpenRouter API key is required. Please provide it or set OPENROUTER_API_KEY environment variable.")
     
-    return ChatOpenAI(
-        model="mistralai/mistral-7b-instruct:free",
-        temperature=0.7,
-        openai_api_key=openrouter_api_key,
-        openai_api_base="https://openrouter.ai/api/v1"
-    )
-
-def get_structured_response(model, prompt: str) -> dict:
-    """Get a structured response from the model"""
-    system_prompt = """You are an essay evaluator. Provide feedback and scoring in JSON format.
+    model = MODEL_NAME if model is None else model
+    temperature = MODEL_TEMPERATURE if temperature is None else temperature
+    return _client_pool.get(openrouter_api_key, model, temperature, OPENROUTER_BASE_URL)
+
+STRUCTURED_SYSTEM_PROMPT = """You are an essay evaluator. Provide feedback and scoring in JSON format.
     Your response should be a valid JSON object with two fields:
     1. feedback: A detailed feedback string
     2. score: An integer score from 0 to 10
@@ -34,21 +94,136 @@ def get_structured_response(model, prompt: str) -> dict:
         "score": 8
     }
     """
-    
-    response = model.invoke(
-        [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt}
-        ]
-    )
-    
+
+FUSED_SYSTEM_PROMPT = """You are an essay evaluator. Evaluate the essay on language quality, depth of analysis
+    and clarity of thought, then summarise. Respond with a single valid JSON object and nothing else.
+    Each of "language", "analysis" and "clarity" must contain:
+    1. feedback: A detailed feedback string
+    2. score: An integer score from 0 to 10
+
+    Example response format:
+    {
+        "language": {"feedback": "Your detailed feedback here...", "score": 7},
+        "analysis": {"feedback": "Your detailed feedback here...", "score": 6},
+        "clarity": {"feedback": "Your detailed feedback here...", "score": 8},
+        "overall_feedback": "Concise summary of key strengths and actionable suggestions..."
+    }
+    """
+
+
+def _build_messages(system_prompt: str, prompt: str) -> list:
+    """Build the chat messages for a system and user prompt"""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": prompt}
+    ]
+
+
+# How structured replies are requested: "json_schema", "function_calling",
+# "json_mode", or "prompt" (JSON instructions in the prompt only)
+STRUCTURED_OUTPUT_METHOD = os.getenv("LLM_STRUCTURED_OUTPUT_METHOD", "function_calling")
+
+# Models found not to support the configured method fall back to prompting
+_unsupported_models = set()
+_unsupported_lock = threading.Lock()
+
+# Error text showing the provider rejected the structured output request itself,
+# as opposed to e.g. an over-long prompt, which fails the same way without it
+_UNSUPPORTED_PATTERN = re.compile(
+    r"tool|function.?call|response.?format|json.?schema|json.?mode|structured.?output", re.IGNORECASE
+)
+
+
+def _structured_method(model) -> str:
+    """Return the structured output method to use for a model"""
+    with _unsupported_lock:
+        if model.model_name in _unsupported_models:
+            return "prompt"
+    return STRUCTURED_OUTPUT_METHOD
+
+
+def _mark_unsupported(model, error: Exception) -> bool:
+    """Remember that a model rejected native structured output; return False for other errors"""
+    if not isinstance(error, NotImplementedError):
+        status = getattr(error, 'status_code', None)
+        if status not in (400, 404, 422) or not _UNSUPPORTED_PATTERN.search(str(error)):
+            return False
+    with _unsupported_lock:
+        _unsupported_models.add(model.model_name)
+    return True
+
+
+def _structured_runnable(model, schema, method: str):
+    """Bind native structured output that also returns the raw message"""
+    return model.with_structured_output(schema, method=method, include_raw=True)
+
+
+def _reply_text(message) -> str:
+    """Return the text of a reply, including tool call arguments"""
+    tool_calls = getattr(message, 'tool_calls', None)
+    if tool_calls:
+        return json.dumps(tool_calls[0]['args'])
+    return message.content
+
+
+def _reask_messages(messages: list, reply: str, error: Exception, schema) -> list:
+    """Append the invalid reply and a targeted correction request"""
+    return messages + [
+        {"role": "assistant", "content": reply},
+        {"role": "user", "content": build_reask_prompt(error, schema)}
+    ]
+
+
+def get_structured_response(model, prompt: str, schema=EvaluationSchema,
+                            system_prompt: str = STRUCTURED_SYSTEM_PROMPT,
+                            priority: int = PRIORITY_NORMAL) -> dict:
+    """Get a response validated against a schema, blocking until it arrives (see aget_structured_response)"""
+    return run_sync(aget_structured_response(model, prompt, schema, system_prompt, priority))
+
+
+async def aget_structured_response(model, prompt: str, schema=EvaluationSchema,
+                                   system_prompt: str = STRUCTURED_SYSTEM_PROMPT,
+                                   priority: int = PRIORITY_NORMAL, kind: str = "structured") -> dict:
+    """
+    Get a response validated against a schema without blocking the event loop
+
+    Uses native structured output where the model supports it, falls back to
+    a tolerant JSON extractor, and re-asks once if the reply fails validation.
+
+    Raises:
+        StructuredOutputError: If the reply is still invalid after the re-ask
+    """
+    messages = _build_messages(system_prompt, prompt)
+    method = _structured_method(model)
+    reply = None
+
+    if method != "prompt":
+        try:
+            output = await ainvoke_model(model, messages, priority, kind,
+                                         runnable=_structured_runnable(model, schema, method))
+        except Exception as e:
+            if not _mark_unsupported(model, e):
+                raise
+        else:
+            if output['parsed'] is not None:
+                return output['parsed'].model_dump()
+            reply = _reply_text(output['raw'])
+
+    if reply is None:
+        reply = (await ainvoke_model(model, messages, priority, kind)).content
+
     try:
-        # Extract the JSON from the response
-        result = json.loads(response.content)
-        return result
-    except json.JSONDecodeError:
-        # Fallback if response is not valid JSON
-        return {
-            "feedback": response.content,
-            "score": 5  # Default score
-        }
+        return parse_structured(reply, schema)
+    except StructuredOutputError as e:
+        retry = await ainvoke_model(model, _reask_messages(messages, reply, e, schema), priority, kind)
+        return parse_structured(retry.content, schema)
+
+
+def get_fused_response(model, prompt: str) -> dict:
+    """Get all rubric evaluations and the summary from the model in one response"""
+    return get_structured_response(model, prompt, FusedEvaluationSchema, FUSED_SYSTEM_PROMPT)
+
+
+async def aget_fused_response(model, prompt: str) -> dict:
+    """Get all rubric evaluations and the summary in one response without blocking the event loop"""
+    return await aget_structured_response(model, prompt, FusedEvaluationSchema, FUSED_SYSTEM_PROMPT, kind="fused")
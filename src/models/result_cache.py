@@ -0,0 +1,223 @@
+from collections import OrderedDict
+from functools import wraps
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from . import llm_config
+
+
+def normalize_essay(text: str) -> str:
+    """Normalize essay text so whitespace-only differences share a cache entry"""
+    lines = [' '.join(line.split()) for line in text.strip().splitlines()]
+    return '\n'.join(line for line in lines if line)
+
+
+def make_cache_key(scope: str, essay: str, extra: dict = None,
+                   model: str = None, temperature: float = None,
+                   prompt_version: str = None) -> str:
+    """
+    Build a content-addressed cache key
+
+    Args:
+        scope: What is being cached (workflow mode or evaluator node name)
+        essay: Essay text, normalized before hashing
+        extra: Additional inputs that affect the result
+        model: Model name (defaults to the configured model the evaluators use)
+        temperature: Sampling temperature (defaults to the configured temperature)
+        prompt_version: Version of the prompts used to produce the result (defaults to PROMPT_VERSION)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps({
+        'scope': scope,
+        'essay': normalize_essay(essay),
+        'extra': extra or {},
+        'model': llm_config.MODEL_NAME if model is None else model,
+        'temperature': llm_config.MODEL_TEMPERATURE if temperature is None else temperature,
+        'prompt_version': llm_config.PROMPT_VERSION if prompt_version is None else prompt_version
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class EvaluationCache:
+    """
+    Two-tier evaluation result cache
+
+    An in-memory LRU tier serves repeat requests within a process, backed by
+    an on-disk SQLite tier that survives restarts. Both tiers expire entries
+    after a TTL.
+    """
+
+    def __init__(self, path: str = None, max_memory_entries: int = 256, ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the cache
+
+        Args:
+            path: SQLite database path, or None for a memory-only cache
+            max_memory_entries: Maximum number of entries in the memory tier
+            ttl: Seconds after which an entry expires
+        """
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0}
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._purge_expired(time.time())
+
+    def get(self, key: str):
+        """Return the cached value for key, or None on a miss"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['memory_hits'] += 1
+                    return json.loads(value)
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM evaluations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at <= self.ttl:
+                        self._remember(key, value, created_at)
+                        self._stats['hits'] += 1
+                        self._stats['disk_hits'] += 1
+                        return json.loads(value)
+                    self._db.execute("DELETE FROM evaluations WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self._stats['misses'] += 1
+            return None
+
+    def set(self, key: str, value: dict):
+        """Store a JSON-serializable value under key"""
+        now = time.time()
+        serialized = json.dumps(value)
+
+        with self._lock:
+            self._remember(key, serialized, now)
+
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO evaluations (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, serialized, now)
+                )
+                self._db.commit()
+
+    def _remember(self, key: str, serialized: str, created_at: float):
+        """Insert into the memory tier, evicting least recently used entries"""
+        self._memory[key] = (serialized, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _purge_expired(self, now: float):
+        """Delete expired entries from the disk tier"""
+        self._db.execute("DELETE FROM evaluations WHERE created_at < ?", (now - self.ttl,))
+        self._db.commit()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def clear(self):
+        """Remove all entries from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM evaluations")
+                self._db.commit()
+
+
+# Process-wide cache shared by evaluate_essay and the evaluator nodes
+_evaluation_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache():
+    """Return the shared evaluation cache, or None if caching is disabled"""
+    global _evaluation_cache
+
+    if os.getenv("EVAL_CACHE_ENABLED", "1") == "0":
+        return None
+
+    if _evaluation_cache is None:
+        with _cache_lock:
+            if _evaluation_cache is None:
+                _evaluation_cache = EvaluationCache(
+                    path=os.getenv("EVAL_CACHE_PATH", os.path.join(".cache", "evaluations.sqlite3")) or None,
+                    max_memory_entries=int(os.getenv("EVAL_CACHE_MEMORY_ENTRIES", "256")),
+                    ttl=float(os.getenv("EVAL_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+                )
+    return _evaluation_cache
+
+
+def cached_evaluation(scope: str, fields: tuple = ()):
+    """
+    Cache an evaluator node's output by essay content
+
+    Args:
+        scope: Cache scope, usually the node name
+        fields: Extra state fields that affect the node's output
+    """
+    def decorator(node):
+        def lookup(state):
+            cache = get_evaluation_cache()
+            if cache is None or state.get('degraded_nodes'):
+                # Results built on degraded upstream output are not worth keeping
+                return None, None, None
+            key = make_cache_key(scope, state["essay"], {field: state.get(field) for field in fields})
+            return cache, key, cache.get(key)
+
+        if inspect.iscoroutinefunction(node):
+            @wraps(node)
+            async def async_wrapper(state):
+                cache, key, cached = lookup(state)
+                if cached is not None:
+                    return cached
+
+                output = await node(state)
+                if cache is not None:
+                    cache.set(key, output)
+                return output
+            return async_wrapper
+
+        @wraps(node)
+        def wrapper(state):
+            cache, key, cached = lookup(state)
+            if cached is not None:
+                return cached
+
+            output = node(state)
+            if cache is not None:
+                cache.set(key, output)
+            return output
+        return wrapper
+    return decorator
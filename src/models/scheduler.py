@@ -0,0 +1,332 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+
+
+# Request priorities (lower runs first)
+PRIORITY_HIGH = 0    # Work that completes an essay already in flight (final summary)
+PRIORITY_NORMAL = 1  # Per-dimension evaluator calls
+
+# Set while running background work (such as batch runs) that should yield to interactive users
+_background = ContextVar('llm_background_requests', default=False)
+
+
+@contextmanager
+def background_requests():
+    """Queue LLM requests made inside this block behind interactive requests"""
+    token = _background.set(True)
+    try:
+        yield
+    finally:
+        _background.reset(token)
+
+
+class RateLimitExceeded(RuntimeError):
+    """Raised when a request is still rate limited after all retries"""
+
+
+# Client errors raised for dropped connections and timeouts (openai and httpx),
+# matched by name so the scheduler does not import either library
+TRANSIENT_ERROR_NAMES = {'APIConnectionError', 'APITimeoutError', 'ConnectError', 'ReadError',
+                         'ReadTimeout', 'ConnectTimeout', 'RemoteProtocolError'}
+
+
+def _status_code(error: Exception):
+    """Return the HTTP status of a provider error, if it has one"""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception is an HTTP 429 from the provider"""
+    return _status_code(error) == 429
+
+
+def is_transient_error(error: Exception) -> bool:
+    """Check whether an exception is a dropped connection, a timeout or a retryable HTTP status (408, 409, 5xx)"""
+    status = _status_code(error)
+    if isinstance(status, int):
+        return status in (408, 409) or status >= 500
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    return any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__)
+
+
+def get_retry_after(error: Exception):
+    """Return the Retry-After delay in seconds from a rate limit error, if present"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    if not headers:
+        return None
+
+    value = headers.get('retry-after')
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    # Retry-After may also be an HTTP date
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Token bucket with an adaptive refill rate
+
+    The rate is halved on every 429 and grows back additively on success, so
+    the scheduler converges on the quota the provider actually allows.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize the bucket
+
+        Args:
+            rate: Maximum refill rate in requests per second
+            capacity: Maximum burst size
+        """
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_limits = 0
+
+    def _refill(self, now: float):
+        """Add tokens accrued since the last update"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a token can be taken (0 if one is available now)"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Take one token"""
+        self.tokens -= 1
+
+    def on_success(self):
+        """Recover the refill rate after a successful request"""
+        self.consecutive_limits = 0
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+    def on_rate_limited(self, now: float, retry_after: float = None,
+                        base_backoff: float = 1.0, max_backoff: float = 60.0) -> float:
+        """
+        Back off after a 429
+
+        Returns:
+            Seconds until requests on this key may resume
+        """
+        self.consecutive_limits += 1
+        self.rate = max(self.min_rate, self.rate / 2)
+        self.tokens = min(self.tokens, 0)
+
+        if retry_after is None:
+            # Exponential backoff with jitter when the server gives no hint
+            retry_after = min(max_backoff, base_backoff * 2 ** (self.consecutive_limits - 1))
+            retry_after *= random.uniform(0.5, 1.0)
+
+        self.blocked_until = max(self.blocked_until, now + retry_after)
+        return retry_after
+
+
+class RequestScheduler:
+    """
+    Shared scheduler that every LLM call goes through
+
+    Requests are queued per API key in priority order and released by that
+    key's token bucket. Rate limit responses slow the bucket down and are
+    retried after the server's Retry-After delay (or an exponential backoff).
+    Dropped connections, timeouts and server errors are retried after an
+    exponential backoff without slowing the bucket. Works from both
+    synchronous and asynchronous callers.
+    """
+
+    def __init__(self, rate: float = 0.5, burst: float = 4, max_retries: int = 3,
+                 base_backoff: float = 1.0, max_backoff: float = 60.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            rate: Requests per second allowed per API key
+            burst: Requests that may start back to back per API key
+            max_retries: Retries after a rate limit response or transient error before giving up
+            base_backoff: Initial backoff when no Retry-After header is sent
+            max_backoff: Upper bound on the backoff delay
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._buckets = {}
+        self._queues = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def _enqueue(self, key: str, priority: int) -> tuple:
+        """Add a ticket to the key's priority queue"""
+        ticket = (_background.get(), priority, next(self._sequence))
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate, self.burst)
+                self._queues[key] = []
+            heapq.heappush(self._queues[key], ticket)
+        return ticket
+
+    def _dequeue(self, key: str, ticket: tuple):
+        """Remove a ticket whose caller gave up waiting"""
+        with self._lock:
+            queue = self._queues[key]
+            if ticket in queue:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+
+    def _try_acquire(self, key: str, ticket: tuple) -> float:
+        """
+        Take a token if the ticket is at the head of its queue
+
+        Returns:
+            0 if the token was taken, otherwise seconds to wait before retrying
+        """
+        with self._lock:
+            queue = self._queues[key]
+            bucket = self._buckets[key]
+            wait = bucket.wait_time(time.monotonic())
+
+            if queue[0] != ticket:
+                # Let higher priority requests go first
+                return max(wait, 0.01)
+            if wait > 0:
+                return wait
+
+            heapq.heappop(queue)
+            bucket.consume()
+            return 0.0
+
+    def _record(self, key: str, error: Exception = None):
+        """Update the key's bucket after a request finishes"""
+        with self._lock:
+            bucket = self._buckets[key]
+            if error is None:
+                bucket.on_success()
+            else:
+                bucket.on_rate_limited(time.monotonic(), get_retry_after(error),
+                                       self.base_backoff, self.max_backoff)
+
+    def _transient_backoff(self, attempt: int) -> float:
+        """Delay before retrying a transient error, with jitter"""
+        return min(self.max_backoff, self.base_backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def has_spare_capacity(self, key: str) -> bool:
+        """Whether a request on the key could start now without delaying queued requests"""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return True
+            return not self._queues[key] and bucket.wait_time(time.monotonic()) == 0
+
+    def _acquire(self, key: str, priority: int):
+        """Block until a request may be sent"""
+        ticket = self._enqueue(key, priority)
+        try:
+            while True:
+                wait = self._try_acquire(key, ticket)
+                if wait == 0:
+                    return
+                time.sleep(min(wait, 1.0))
+        except BaseException:
+            self._dequeue(key, ticket)
+            raise
+
+    async def _aacquire(self, key: str, priority: int):
+        """Wait without blocking the event loop until a request may be sent"""
+        ticket = self._enqueue(key, priority)
+        try:
+            while True:
+                wait = self._try_acquire(key, ticket)
+                if wait == 0:
+                    return
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            self._dequeue(key, ticket)
+            raise
+
+    def run(self, key: str, func, priority: int = PRIORITY_NORMAL):
+        """
+        Run a synchronous request under the key's rate limit
+
+        Args:
+            key: API key the request is billed to
+            func: Zero-argument callable performing the request
+            priority: Queue priority (lower runs first)
+
+        Returns:
+            The callable's result
+        """
+        for attempt in range(self.max_retries + 1):
+            self._acquire(key, priority)
+            try:
+                result = func()
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self._record(key, e)
+                    if attempt == self.max_retries:
+                        raise RateLimitExceeded(f"Rate limited after {self.max_retries} retries: {str(e)}") from e
+                    continue
+                if is_transient_error(e) and attempt < self.max_retries:
+                    time.sleep(self._transient_backoff(attempt))
+                    continue
+                raise
+            self._record(key)
+            return result
+
+    async def arun(self, key: str, afunc, priority: int = PRIORITY_NORMAL):
+        """
+        Run an asynchronous request under the key's rate limit
+
+        Args:
+            key: API key the request is billed to
+            afunc: Zero-argument callable returning an awaitable request
+            priority: Queue priority (lower runs first)
+
+        Returns:
+            The awaited result
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._aacquire(key, priority)
+            try:
+                result = await afunc()
+            except Exception as e:
+                if is_rate_limit_error(e):
+                    self._record(key, e)
+                    if attempt == self.max_retries:
+                        raise RateLimitExceeded(f"Rate limited after {self.max_retries} retries: {str(e)}") from e
+                    continue
+                if is_transient_error(e) and attempt < self.max_retries:
+                    await asyncio.sleep(self._transient_backoff(attempt))
+                    continue
+                raise
+            self._record(key)
+            return result
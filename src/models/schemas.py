@@ -1,8 +1,13 @@
 from pydantic import BaseModel, Field
-from typing import TypedDict, Annotated
+from typing import TypedDict, Annotated, Optional
 import operator
 
 
+def merge_dicts(left: dict, right: dict) -> dict:
+    """Reducer that merges dictionaries written by parallel nodes"""
+    return {**left, **right}
+
+
 class EvaluationSchema(BaseModel):
     """Schema for individual evaluation results"""
     feedback: str = Field(description='Detailed feedback for the essay')
@@ -18,7 +23,9 @@ class UPSCState(TypedDict):
     clarity_feedback: str
     overall_feedback: str
     individual_scores: Annotated[list[int], operator.add]
-    avg_score: float
+    dimension_scores: Annotated[dict[str, int], merge_dicts]
+    degraded_nodes: Annotated[list[str], operator.add]
+    avg_score: Optional[float]  # None when no dimension finished
 
 
 class EvaluationResult(BaseModel):
@@ -28,4 +35,14 @@ class EvaluationResult(BaseModel):
     clarity_feedback: str
     overall_feedback: str
     individual_scores: list[int]
-    avg_score: float
+    avg_score: Optional[float]  # None when no dimension finished
+    dimension_scores: dict[str, int] = {}
+    degraded_nodes: list[str] = []
+
+
+class FusedEvaluationSchema(BaseModel):
+    """Schema for a single-call evaluation covering all rubric dimensions"""
+    language: EvaluationSchema = Field(description='Language quality evaluation')
+    analysis: EvaluationSchema = Field(description='Depth of analysis evaluation')
+    clarity: EvaluationSchema = Field(description='Clarity of thought evaluation')
+    overall_feedback: str = Field(description='Concise overall summary with actionable suggestions')
@@ -0,0 +1,167 @@
+import json
+import re
+
+from pydantic import BaseModel, ValidationError
+
+
+class StructuredOutputError(ValueError):
+    """Raised when a model reply cannot be parsed into the expected schema"""
+
+
+_FENCE_PATTERN = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def _scan(text: str):
+    """
+    Scan JSON text from its first character
+
+    Returns:
+        (end, cut_points) where end is the index just past the balanced value
+        (or None if the text is truncated) and cut_points lists the index
+        of each comma outside a string
+    """
+    stack = []
+    cut_points = []
+    in_string = False
+    escaped = False
+
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in '}]':
+            if stack:
+                stack.pop()
+            if not stack:
+                return index + 1, cut_points
+        elif char == ',':
+            cut_points.append(index)
+
+    return None, cut_points
+
+
+def _close(text: str) -> str:
+    """Close any string and brackets left open at the end of truncated JSON"""
+    stack = []
+    in_string = False
+    escaped = False
+
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in '}]' and stack:
+            stack.pop()
+
+    if in_string:
+        text += '"'
+    return text + ''.join(_CLOSERS[bracket] for bracket in reversed(stack))
+
+
+def _loads(candidate: str):
+    """json.loads that also tolerates trailing commas"""
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        return json.loads(re.sub(r",\s*([}\]])", r"\1", candidate))
+
+
+def extract_json(text: str, allow_partial: bool = False) -> dict:
+    """
+    Extract a JSON object from a model reply
+
+    Handles replies wrapped in markdown fences or surrounded by prose and,
+    when allow_partial is set, truncated replies (unterminated strings,
+    missing closing brackets, a dangling last field). Repair is only meant
+    for previews of a reply still streaming in: a repaired final reply may
+    carry a cut-off value, e.g. a score of 1 that was really 10.
+
+    Args:
+        text: Raw model reply
+        allow_partial: Whether to repair truncated JSON (streaming previews only)
+
+    Returns:
+        Parsed JSON object
+
+    Raises:
+        StructuredOutputError: If no JSON object can be recovered
+    """
+    if not text:
+        raise StructuredOutputError("Model reply is empty")
+
+    fenced = _FENCE_PATTERN.search(text)
+    if fenced and '{' in fenced.group(1):
+        text = fenced.group(1)
+
+    start = text.find('{')
+    if start == -1:
+        raise StructuredOutputError("Model reply does not contain a JSON object")
+    text = text[start:]
+
+    end, cut_points = _scan(text)
+    if end is not None:
+        try:
+            result = _loads(text[:end])
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"Model reply is not valid JSON: {str(e)}")
+        return result
+
+    if not allow_partial:
+        raise StructuredOutputError("Model reply contains truncated JSON")
+
+    # Close the truncated value, dropping incomplete trailing fields if needed
+    candidates = [text] + [text[:index] for index in reversed(cut_points)]
+    for candidate in candidates:
+        try:
+            result = _loads(_close(candidate.rstrip()))
+        except json.JSONDecodeError:
+            continue
+        if isinstance(result, dict):
+            return result
+
+    raise StructuredOutputError("Model reply contains JSON that could not be repaired")
+
+
+def parse_structured(text: str, schema: type[BaseModel]) -> dict:
+    """
+    Parse a model reply and validate it against a schema
+
+    Truncated replies are rejected rather than repaired, so a reply cut off
+    by the token limit leads to a re-ask instead of a wrong score.
+
+    Raises:
+        StructuredOutputError: If the reply cannot be parsed or fails validation
+    """
+    data = extract_json(text, allow_partial=False)
+    try:
+        return schema.model_validate(data).model_dump()
+    except ValidationError as e:
+        raise StructuredOutputError(f"Model reply does not match {schema.__name__}: {str(e)}")
+
+
+def build_reask_prompt(error: Exception, schema: type[BaseModel]) -> str:
+    """Build the follow-up prompt asking the model to correct an invalid reply"""
+    return (
+        f"Your previous reply could not be used: {str(error)}\n"
+        "Reply again with only a single JSON object, no prose or markdown, "
+        f"matching this JSON schema:\n{json.dumps(schema.model_json_schema())}"
+    )
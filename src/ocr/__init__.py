@@ -1,3 +1,8 @@
 from .ocr_processor import OCRProcessor, OCREngine
+from .ocr_cache import OCRCache, get_ocr_cache
+from .ocr_service import RemoteOCR, get_remote_ocr
+from .page_detection import PageDetector
+from .preprocessing import DenoiseMode, Preprocessor
+from .shared_engine import SharedOCR, get_shared_ocr
 
-__all__ = ["OCRProcessor", "OCREngine"]
+__all__ = ["OCRProcessor", "OCREngine", "DenoiseMode", "Preprocessor", "PageDetector", "OCRCache", "get_ocr_cache", "RemoteOCR", "get_remote_ocr", "SharedOCR", "get_shared_ocr"]
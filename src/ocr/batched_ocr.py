@@ -0,0 +1,145 @@
+"""
+Batched EasyOCR recognition across text lines of many pages
+"""
+from typing import List
+
+import numpy as np
+
+
+class BatchedRecognizer:
+    """
+    Recognize the text lines of several pages in shared recognizer batches
+
+    Line regions are detected on every page, their crops are stacked into one
+    strip image and recognized together with a configurable batch size, so
+    the recognizer runs full batches instead of one small batch per page.
+    Results are mapped back to their page and sorted into reading order.
+    """
+
+    def __init__(self, reader, batch_size: int = 16, width_ths: float = 0.7, height_ths: float = 0.7):
+        """
+        Initialize the batched recognizer
+
+        Args:
+            reader: easyocr.Reader instance
+            batch_size: Number of line crops per recognizer batch
+            width_ths: Maximum horizontal distance for merging detected boxes
+            height_ths: Maximum height difference for merging detected boxes
+        """
+        self.reader = reader
+        self.batch_size = batch_size
+        self.width_ths = width_ths
+        self.height_ths = height_ths
+
+    def _line_crops(self, page: "np.ndarray") -> list:
+        """Detect line regions on a grayscale page and return (page_box, crop) pairs"""
+        from easyocr.utils import four_point_transform
+
+        horizontal_list, free_list = self.reader.detect(
+            page, width_ths=self.width_ths, height_ths=self.height_ths
+        )
+        height, width = page.shape[:2]
+        crops = []
+
+        for x_min, x_max, y_min, y_max in horizontal_list[0]:
+            x_min, x_max = max(0, int(x_min)), min(width, int(x_max))
+            y_min, y_max = max(0, int(y_min)), min(height, int(y_max))
+            if x_max <= x_min or y_max <= y_min:
+                continue
+            box = [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]]
+            crops.append((box, page[y_min:y_max, x_min:x_max]))
+
+        for points in free_list[0]:
+            # Rotated regions are straightened before recognition
+            crop = four_point_transform(page, np.array(points, dtype="float32"))
+            if crop.size:
+                crops.append(([[int(x), int(y)] for x, y in points], crop))
+
+        return crops
+
+    def _recognize_strip(self, strip: "np.ndarray", boxes: list) -> list:
+        """Recognize every box of the strip in batches of batch_size"""
+        try:
+            from easyocr.recognition import get_text
+            from easyocr.utils import get_image_list
+        except ImportError:
+            get_text = None
+
+        if get_text is None or not hasattr(self.reader, 'lang_char'):
+            return self.reader.recognize(
+                strip, horizontal_list=boxes, free_list=[], batch_size=self.batch_size, detail=1
+            )
+
+        # Reader.recognize() processes boxes one at a time on CPU regardless of
+        # batch_size, so drive the recognizer directly to get real batches
+        model_height = 64
+        image_list, max_width = get_image_list(boxes, [], strip, model_height=model_height)
+        ignore_char = ''.join(set(self.reader.character) - set(self.reader.lang_char))
+        return get_text(
+            self.reader.character, model_height, int(max_width), self.reader.recognizer,
+            self.reader.converter, image_list, ignore_char, 'greedy', 5, self.batch_size,
+            0.1, 0.5, 0.003, 0, self.reader.device
+        )
+
+    @staticmethod
+    def _reading_order(results: list) -> list:
+        """Sort (box, text, confidence) results top-to-bottom, then left-to-right within a line"""
+        if not results:
+            return results
+
+        heights = sorted(box[2][1] - box[0][1] for box, _, _ in results)
+        line_height = max(1, heights[len(heights) // 2])
+
+        def key(result):
+            box = result[0]
+            y_center = (box[0][1] + box[2][1]) / 2
+            return int(y_center // line_height), box[0][0]
+
+        return sorted(results, key=key)
+
+    def recognize_pages(self, pages: List["np.ndarray"]) -> List[list]:
+        """
+        Recognize all text lines of the given pages
+
+        Args:
+            pages: Grayscale uint8 page images
+
+        Returns:
+            For each page, a list of (box, text, confidence) in page
+            coordinates and reading order
+        """
+        owners = []
+        crops = []
+        for page_index, page in enumerate(pages):
+            for box, crop in self._line_crops(page):
+                owners.append((page_index, box))
+                crops.append(crop)
+
+        results = [[] for _ in pages]
+        if not crops:
+            return results
+
+        # Stack every crop into one strip; each crop keeps a unique y offset
+        # so recognized boxes can be traced back to their page
+        strip_width = max(crop.shape[1] for crop in crops)
+        strip = np.full((sum(crop.shape[0] for crop in crops), strip_width), 255, dtype=np.uint8)
+        strip_boxes = []
+        offsets = {}
+        y_offset = 0
+        for index, crop in enumerate(crops):
+            height, width = crop.shape[:2]
+            strip[y_offset:y_offset + height, :width] = crop
+            strip_boxes.append([0, width, y_offset, y_offset + height])
+            offsets[y_offset] = index
+            y_offset += height
+
+        recognized = self._recognize_strip(strip, strip_boxes)
+
+        for strip_box, text, confidence in recognized:
+            index = offsets.get(int(strip_box[0][1]))
+            if index is None:
+                continue
+            page_index, box = owners[index]
+            results[page_index].append((box, text, float(confidence)))
+
+        return [self._reading_order(page_results) for page_results in results]
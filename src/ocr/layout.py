@@ -0,0 +1,100 @@
+"""
+Text layouts built from a single EasyOCR detection/recognition pass
+"""
+from typing import List, Tuple
+
+
+def _text_score(boxes: list) -> float:
+    """
+    Confidence-weighted quality of a set of recognized boxes
+
+    Each box adds its expected correct characters and subtracts its expected
+    wrong ones, so low-confidence detections lower the score. Spaces are not
+    counted, so merged text and the words it came from score alike.
+    """
+    return sum(len(text.replace(' ', '')) * (2 * confidence - 1) for _, text, confidence in boxes)
+
+
+def _mean_confidence(boxes: list) -> float:
+    """Length-weighted mean confidence of a set of recognized boxes"""
+    length = sum(len(text) for _, text, _ in boxes)
+    if not length:
+        return 0.0
+    return sum(len(text) * confidence for _, text, confidence in boxes) / length
+
+
+def _paragraphs(results: list, x_ths: float = 1.0, y_ths: float = 0.5) -> List[Tuple[str, list]]:
+    """
+    Merge word-level boxes into paragraphs, keeping the boxes each one was built from
+
+    Returns:
+        (paragraph text, member boxes) in reading order
+    """
+    if not results:
+        return []
+
+    from easyocr.utils import get_paragraph
+
+    unassigned = set(range(len(results)))
+    paragraphs = []
+    for box, text in get_paragraph(results, x_ths=x_ths, y_ths=y_ths):
+        xs = [point[0] for point in box]
+        ys = [point[1] for point in box]
+        members = []
+        for index in sorted(unassigned):
+            corners = results[index][0]
+            center_x = sum(point[0] for point in corners) / len(corners)
+            center_y = sum(point[1] for point in corners) / len(corners)
+            if min(xs) <= center_x <= max(xs) and min(ys) <= center_y <= max(ys):
+                members.append(index)
+        unassigned.difference_update(members)
+        paragraphs.append((text, [results[index] for index in members]))
+    return paragraphs
+
+
+def paragraph_text(results: list, x_ths: float = 1.0, y_ths: float = 0.5) -> str:
+    """
+    Merge word-level boxes into paragraphs, as readtext(paragraph=True) would
+
+    Args:
+        results: EasyOCR (box, text, confidence) results from readtext(paragraph=False)
+        x_ths: Maximum horizontal gap (in box heights) when merging boxes
+        y_ths: Maximum vertical gap (in box heights) when merging boxes
+
+    Returns:
+        Paragraph texts joined with spaces
+    """
+    return ' '.join(text for text, _ in _paragraphs(results, x_ths=x_ths, y_ths=y_ths))
+
+
+def word_text(results: list, confidence_threshold: float = 0.2) -> str:
+    """Join word-level boxes above the confidence threshold in detection order"""
+    return ' '.join(text for _, text, confidence in results if confidence > confidence_threshold)
+
+
+def select_text(results: List[tuple], confidence_threshold: float = 0.2) -> str:
+    """
+    Build paragraph and word layouts from the same boxes and pick the better one
+
+    Boxes at or below the confidence threshold are dropped first, so both
+    layouts start from the same words. The paragraph layout merges them in
+    reading order and each paragraph is scored by its merged text at the
+    length-weighted mean confidence of the boxes it was built from; the word
+    layout scores each word on its own. The higher score wins, preferring
+    paragraphs on a tie, so detection order is only used when merging lost
+    or garbled recognized text.
+
+    Args:
+        results: EasyOCR (box, text, confidence) results from readtext(paragraph=False)
+        confidence_threshold: Minimum confidence of a kept box
+
+    Returns:
+        Selected text
+    """
+    confident = [result for result in results if result[2] > confidence_threshold]
+    paragraphs = _paragraphs(confident)
+
+    merged = [(None, text, _mean_confidence(members)) for text, members in paragraphs]
+    if _text_score(merged) >= _text_score(confident):
+        return ' '.join(text for text, _ in paragraphs)
+    return word_text(confident, confidence_threshold)
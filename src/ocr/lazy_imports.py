@@ -0,0 +1,59 @@
+"""
+Lazy loading of heavy optional dependencies
+
+torch (through EasyOCR), OpenCV and Tesseract bindings take seconds to
+import. Modules refer to them through LazyModule proxies that import on
+first attribute access, and check availability with find_spec, which
+locates a package without importing it.
+"""
+import importlib
+import importlib.util
+import threading
+
+
+def is_available(name: str) -> bool:
+    """Whether a top-level package can be imported, without importing it"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access"""
+
+    def __init__(self, name: str):
+        """
+        Initialize the proxy
+
+        Args:
+            name: Dotted module name, e.g. "PIL.Image"
+        """
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Import the module once"""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the module has been imported through this proxy"""
+        return self._module is not None
+
+    def __getattr__(self, attribute: str):
+        return getattr(self._load(), attribute)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy that imports the named module on first use"""
+    return LazyModule(name)
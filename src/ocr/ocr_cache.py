@@ -0,0 +1,353 @@
+"""
+Disk-backed OCR result cache keyed by page content and perceptual hash
+"""
+from collections import namedtuple
+from typing import List, Optional, Tuple
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from .lazy_imports import is_available, lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+CV2_AVAILABLE = is_available("cv2") and is_available("numpy")
+
+Image = lazy_import("PIL.Image")
+PIL_AVAILABLE = is_available("PIL")
+
+
+# Bump when preprocessing, cropping, recognition or text layout changes so
+# stale results are not served
+OCR_PIPELINE_VERSION = "2"
+
+# Identifies one page: exact content hash plus perceptual hash, aspect ratio and
+# the grayscale thumbnail that confirms near matches
+PageKey = namedtuple("PageKey", ["scope", "content_hash", "phash", "aspect", "thumbnail"])
+
+# Side of the square grayscale thumbnail compared before a near match is served
+THUMBNAIL_SIZE = 128
+
+
+def content_hash(image_input) -> str:
+    """SHA-256 of the raw upload bytes, or of the decoded pixels for in-memory images"""
+    digest = hashlib.sha256()
+    if isinstance(image_input, bytes):
+        digest.update(image_input)
+    elif PIL_AVAILABLE and isinstance(image_input, Image.Image):
+        digest.update(f"{image_input.mode}:{image_input.size}".encode())
+        digest.update(image_input.tobytes())
+    else:
+        digest.update(f"{image_input.dtype}:{image_input.shape}".encode())
+        digest.update(image_input.tobytes())
+    return digest.hexdigest()
+
+
+def _gray_thumbnail(image_input, size: Tuple[int, int]) -> Tuple["np.ndarray", int, int]:
+    """Decode the page and shrink it to size (width, height) block means; also returns the page size"""
+    if isinstance(image_input, bytes):
+        image_input = Image.open(io.BytesIO(image_input))
+
+    if PIL_AVAILABLE and isinstance(image_input, Image.Image):
+        width, height = image_input.size
+        return np.asarray(image_input.convert('L').resize(size, Image.Resampling.BOX)), width, height
+
+    height, width = image_input.shape[:2]
+    gray = image_input if image_input.ndim == 2 else cv2.cvtColor(image_input, cv2.COLOR_RGB2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA), width, height
+
+
+def perceptual_hash(image_input, hash_size: int = 16) -> Tuple[int, float]:
+    """
+    Difference hash of the decoded page
+
+    The page is shrunk to (hash_size + 1) x hash_size block means and each
+    bit records whether a block is brighter than its right neighbour, so
+    re-encoding, resizing or mild recompression keeps almost every bit.
+
+    Args:
+        image_input: Image (bytes, PIL Image or numpy array)
+        hash_size: Bits per side of the hash
+
+    Returns:
+        (hash as an integer of hash_size**2 bits, width / height aspect ratio)
+    """
+    phash, aspect, _ = page_signature(image_input, hash_size)
+    return phash, aspect
+
+
+def page_signature(image_input, hash_size: int = 16,
+                   thumbnail_size: int = THUMBNAIL_SIZE) -> Tuple[int, float, bytes]:
+    """
+    Perceptual hash, aspect ratio and grayscale thumbnail of a page, decoding it once
+
+    Returns:
+        (hash as in perceptual_hash, width / height aspect ratio,
+         thumbnail_size x thumbnail_size uint8 grayscale thumbnail bytes)
+    """
+    thumbnail, width, height = _gray_thumbnail(image_input, (thumbnail_size, thumbnail_size))
+    small = cv2.resize(thumbnail, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value, width / max(1, height), np.ascontiguousarray(thumbnail, dtype=np.uint8).tobytes()
+
+
+def thumbnail_correlation(first: bytes, second: bytes) -> float:
+    """Pearson correlation of two grayscale thumbnails (1.0 for the same page)"""
+    a = np.frombuffer(first, dtype=np.uint8).astype(np.float32)
+    b = np.frombuffer(second, dtype=np.uint8).astype(np.float32)
+    if a.size != b.size or a.size == 0:
+        return 0.0
+    a -= a.mean()
+    b -= b.mean()
+    norm = float(np.sqrt((a * a).sum() * (b * b).sum()))
+    return float((a * b).sum()) / norm if norm else float(first == second)
+
+
+class OCRCache:
+    """
+    Cache of OCR results for pages that were already read
+
+    Entries are found by the exact content hash. With max_distance > 0 a
+    miss also tries the nearest perceptual hash with the same aspect ratio,
+    so a re-encoded copy of the same photo can hit; such a near match is
+    only served when the pixel correlation of the two grayscale thumbnails
+    reaches min_correlation, because different pages of one essay on the
+    same paper can have close hashes. Each entry keeps the page text and its
+    per-box text and confidences. Entries live in SQLite and the least
+    recently used ones are evicted once the cache grows beyond max_bytes.
+
+    The database file can be shared by several processes (the app, the OCR
+    worker daemon, the parallel OCR workers). The total size is therefore
+    read from the database when evicting, and the in-memory hash index is
+    rebuilt whenever another process has changed the database.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 64 * 1024 * 1024, max_distance: int = 6,
+                 min_correlation: float = 0.97):
+        """
+        Initialize the cache
+
+        Args:
+            path: SQLite database path, or None for a memory-only cache
+            max_bytes: Upper bound on the total size of stored entries
+            max_distance: Largest Hamming distance between perceptual hashes of
+                the same page (0 only matches identical content)
+            min_correlation: Thumbnail correlation a near match needs to be served
+        """
+        if not CV2_AVAILABLE or not PIL_AVAILABLE:
+            raise RuntimeError("OpenCV, NumPy and Pillow required for the OCR cache")
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_distance = max_distance
+        self.min_correlation = min_correlation
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'exact_hits': 0, 'similar_hits': 0, 'evictions': 0}
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", timeout=10, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS ocr_pages "
+            "(scope TEXT NOT NULL, content_hash TEXT NOT NULL, phash TEXT NOT NULL, aspect REAL NOT NULL, "
+            "value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL, thumbnail BLOB, "
+            "PRIMARY KEY (scope, content_hash))"
+        )
+        # Caches written before thumbnails existed get the column; their entries only match exactly
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(ocr_pages)")]
+        if "thumbnail" not in columns:
+            self._db.execute("ALTER TABLE ocr_pages ADD COLUMN thumbnail BLOB")
+        self._db.commit()
+
+        # Perceptual hashes are compared in memory; the table holds the entries
+        self._index = {}
+        self._data_version = None
+        self._refresh()
+
+    def _refresh(self):
+        """Rebuild the hash index if another connection changed the database (caller holds the lock)"""
+        # data_version only changes on commits by other connections; ours update the index directly
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        self._index = {
+            (scope, digest): (int(phash, 16), aspect)
+            for scope, digest, phash, aspect in self._db.execute(
+                "SELECT scope, content_hash, phash, aspect FROM ocr_pages"
+            )
+        }
+        self._data_version = version
+
+    def _total_size(self) -> int:
+        """Total size of the stored entries, including other processes' (caller holds the lock)"""
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM ocr_pages").fetchone()[0]
+
+    def _find_similar(self, scope: str, phash: int, aspect: float, thumbnail: bytes) -> Optional[str]:
+        """
+        Content hash of the closest stored page within max_distance whose
+        thumbnail correlates with this one, if any (caller holds the lock)
+        """
+        candidates = []
+        for (entry_scope, digest), (entry_phash, entry_aspect) in self._index.items():
+            if entry_scope != scope or abs(entry_aspect - aspect) > 0.01 * aspect:
+                continue
+            distance = bin(entry_phash ^ phash).count("1")
+            if distance <= self.max_distance:
+                candidates.append((distance, digest))
+
+        for _, digest in sorted(candidates):
+            row = self._db.execute(
+                "SELECT thumbnail FROM ocr_pages WHERE scope = ? AND content_hash = ?", (scope, digest)
+            ).fetchone()
+            if row and row[0] and thumbnail_correlation(thumbnail, row[0]) >= self.min_correlation:
+                return digest
+        return None
+
+    def _load(self, scope: str, digest: str) -> Optional[dict]:
+        """Read an entry and mark it as recently used (caller holds the lock)"""
+        row = self._db.execute(
+            "SELECT value FROM ocr_pages WHERE scope = ? AND content_hash = ?", (scope, digest)
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute(
+            "UPDATE ocr_pages SET last_used = ? WHERE scope = ? AND content_hash = ?",
+            (time.time(), scope, digest)
+        )
+        self._db.commit()
+        return json.loads(row[0])
+
+    def lookup(self, scope: str, image_input) -> Tuple[Optional[dict], PageKey]:
+        """
+        Look up the OCR result for a page
+
+        Args:
+            scope: Engine and settings that produced the result
+            image_input: Page image (bytes, PIL Image or numpy array)
+
+        Returns:
+            (entry with 'text' and 'boxes', or None on a miss; key to store a fresh result under)
+        """
+        scope = f"{scope}:v{OCR_PIPELINE_VERSION}"
+        digest = content_hash(image_input)
+
+        with self._lock:
+            entry = self._load(scope, digest)
+            if entry is not None:
+                self._stats['hits'] += 1
+                self._stats['exact_hits'] += 1
+                return entry, PageKey(scope, digest, None, None, None)
+
+        # Decoding for the perceptual hash is only needed on an exact miss
+        phash, aspect, thumbnail = page_signature(image_input)
+
+        with self._lock:
+            if self.max_distance > 0:
+                self._refresh()
+                similar = self._find_similar(scope, phash, aspect, thumbnail)
+                if similar is not None:
+                    entry = self._load(scope, similar)
+                    if entry is not None:
+                        self._stats['hits'] += 1
+                        self._stats['similar_hits'] += 1
+                        return entry, PageKey(scope, digest, phash, aspect, thumbnail)
+
+            self._stats['misses'] += 1
+            return None, PageKey(scope, digest, phash, aspect, thumbnail)
+
+    def store(self, key: PageKey, text: str, boxes: List[tuple] = ()):
+        """
+        Store the OCR result for a page looked up with lookup()
+
+        Args:
+            key: Key returned by lookup()
+            text: Final page text
+            boxes: (box, text, confidence) results the text was built from
+        """
+        if key.phash is None:
+            return
+
+        value = json.dumps({
+            'text': text,
+            'boxes': [
+                [[[float(x), float(y)] for x, y in box], box_text, float(confidence)]
+                for box, box_text, confidence in boxes
+            ]
+        })
+        size = len(value) + len(key.thumbnail or b"")
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO ocr_pages "
+                "(scope, content_hash, phash, aspect, value, size, last_used, thumbnail) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key.scope, key.content_hash, format(key.phash, "x"), key.aspect, value, size, time.time(),
+                 key.thumbnail)
+            )
+            self._index[(key.scope, key.content_hash)] = (key.phash, key.aspect)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits max_bytes (caller holds the lock)"""
+        # Runs inside the write transaction of store(), so other processes cannot change the total meanwhile
+        total = self._total_size()
+        while total > self.max_bytes:
+            row = self._db.execute(
+                "SELECT scope, content_hash, size FROM ocr_pages ORDER BY last_used LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            scope, digest, size = row
+            self._db.execute("DELETE FROM ocr_pages WHERE scope = ? AND content_hash = ?", (scope, digest))
+            self._index.pop((scope, digest), None)
+            total -= size
+            self._stats['evictions'] += 1
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current number and size of entries"""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM ocr_pages"
+            ).fetchone()
+            return {**self._stats, 'entries': entries, 'bytes': size}
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._db.execute("DELETE FROM ocr_pages")
+            self._db.commit()
+            self._index.clear()
+
+
+_ocr_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> Optional[OCRCache]:
+    """Return the shared OCR cache, or None if caching is disabled or unavailable"""
+    global _ocr_cache
+
+    if os.getenv("OCR_CACHE_ENABLED", "1") == "0" or not (CV2_AVAILABLE and PIL_AVAILABLE):
+        return None
+
+    if _ocr_cache is None:
+        with _cache_lock:
+            if _ocr_cache is None:
+                _ocr_cache = OCRCache(
+                    path=os.getenv("OCR_CACHE_PATH", os.path.join(".cache", "ocr.sqlite3")) or None,
+                    max_bytes=int(float(os.getenv("OCR_CACHE_MAX_MB", "64")) * 1024 * 1024),
+                    max_distance=int(os.getenv("OCR_CACHE_MAX_DISTANCE", "6")),
+                    min_correlation=float(os.getenv("OCR_CACHE_MIN_CORRELATION", "0.97"))
+                )
+    return _ocr_cache
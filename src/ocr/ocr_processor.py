@@ -1,43 +1,35 @@
 from enum import Enum
 from typing import Optional, Union
 import io
+import os
 
-# Try to import OCR dependencies
-try:
-    import cv2
-    CV2_AVAILABLE = True
-except ImportError:
-    CV2_AVAILABLE = False
+from .layout import select_text
+from .lazy_imports import is_available, lazy_import
+from .preprocessing import DenoiseMode, Preprocessor
+from .tesserocr_backend import TESSEROCR_AVAILABLE, recognize as tesserocr_recognize
 
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    NUMPY_AVAILABLE = False
+# Heavy OCR dependencies are imported on first use
+cv2 = lazy_import("cv2")
+CV2_AVAILABLE = is_available("cv2")
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+np = lazy_import("numpy")
+NUMPY_AVAILABLE = is_available("numpy")
 
-try:
-    import pytesseract
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
+Image = lazy_import("PIL.Image")
+PIL_AVAILABLE = is_available("PIL")
 
-try:
-    import easyocr
-    EASYOCR_AVAILABLE = True
-except ImportError:
-    EASYOCR_AVAILABLE = False
+pytesseract = lazy_import("pytesseract")
+TESSERACT_AVAILABLE = is_available("pytesseract")
+
+easyocr = lazy_import("easyocr")
+EASYOCR_AVAILABLE = is_available("easyocr")
 
 
 class OCREngine(Enum):
     """Available OCR engines"""
     TESSERACT = "tesseract"
     EASYOCR = "easyocr"
+    TESSEROCR = "tesserocr"
 
 
 class OCRProcessor:
@@ -45,15 +37,26 @@ class OCRProcessor:
     OCR processor for extracting text from images of handwritten essays
     """
     
-    def __init__(self, engine: OCREngine = OCREngine.EASYOCR):
+    def __init__(self, engine: OCREngine = OCREngine.EASYOCR, denoise: Optional[DenoiseMode] = None):
         """
         Initialize OCR processor
         
         Args:
-            engine: OCR engine to use (TESSERACT or EASYOCR)
+            engine: OCR engine to use (TESSERACT, EASYOCR or TESSEROCR)
+            denoise: Denoising strategy for preprocessing (defaults to OCR_DENOISE, or AUTO)
         """
+        # Without the tesserocr binding the in-process engine falls back to pytesseract
+        if engine == OCREngine.TESSEROCR and not TESSEROCR_AVAILABLE:
+            engine = OCREngine.TESSERACT
+        
         self.engine = engine
         self._easyocr_reader = None
+        self._preprocessor = None
+        if CV2_AVAILABLE and NUMPY_AVAILABLE:
+            self._preprocessor = Preprocessor(
+                min_size=0, contrast=1.0, sharpness=1.0,
+                denoise=denoise or DenoiseMode(os.getenv("OCR_DENOISE", "auto"))
+            )
         
         # Check dependencies
         if not self._check_dependencies():
@@ -88,12 +91,12 @@ class OCRProcessor:
         except Exception as e:
             raise RuntimeError(f"Failed to initialize EasyOCR: {str(e)}")
     
-    def preprocess_image(self, image: Union["np.ndarray", "Image.Image"]) -> "np.ndarray":
+    def preprocess_image(self, image: Union[bytes, "np.ndarray", "Image.Image"]) -> "np.ndarray":
         """
         Preprocess image for better OCR results
         
         Args:
-            image: Input image (PIL Image or numpy array)
+            image: Input image (bytes, PIL Image or numpy array)
             
         Returns:
             Preprocessed image as numpy array
@@ -101,29 +104,8 @@ class OCRProcessor:
         if not CV2_AVAILABLE or not NUMPY_AVAILABLE:
             raise RuntimeError("OpenCV and NumPy required for image preprocessing. Install with: pip install opencv-python numpy")
         
-        # Convert PIL Image to numpy array if needed
-        if isinstance(image, Image.Image):
-            image = np.array(image)
-        
-        # Convert to grayscale if needed
-        if len(image.shape) == 3:
-            gray = cv2.cvtColor(image, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = image.copy()
-        
-        # Apply noise reduction
-        denoised = cv2.fastNlMeansDenoising(gray)
-        
-        # Apply adaptive thresholding for better text contrast
-        adaptive_thresh = cv2.adaptiveThreshold(
-            denoised, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        
-        # Optional: Apply morphological operations to clean up the image
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 1))
-        cleaned = cv2.morphologyEx(adaptive_thresh, cv2.MORPH_CLOSE, kernel)
-        
-        return cleaned
+        # Grayscale, denoise and threshold in one pass over a single buffer
+        return self._preprocessor.run(image)
     
     def extract_text_tesseract(self, image: "np.ndarray") -> str:
         """
@@ -152,6 +134,27 @@ class OCRProcessor:
         except Exception as e:
             raise RuntimeError(f"Tesseract OCR failed: {str(e)}. Please install Tesseract from https://github.com/UB-Mannheim/tesseract/wiki")
     
+    def extract_text_tesserocr(self, image: "np.ndarray") -> str:
+        """
+        Extract text using the in-process Tesseract API of the current thread
+        
+        Args:
+            image: Preprocessed image
+            
+        Returns:
+            Extracted text
+        """
+        if not TESSEROCR_AVAILABLE:
+            raise RuntimeError("tesserocr not available. Install with: pip install tesserocr")
+        
+        try:
+            custom_config = r'--oem 3 --psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?;:()[]{}"\'-/\n '
+            
+            text, _ = tesserocr_recognize(Image.fromarray(image), custom_config)
+            return text.strip()
+        except Exception as e:
+            raise RuntimeError(f"Tesseract OCR failed: {str(e)}")
+    
     def _setup_tesseract_path(self):
         """Setup Tesseract path for Windows if not in PATH"""
         import os
@@ -188,17 +191,11 @@ class OCRProcessor:
             if self._easyocr_reader is None:
                 self._init_easyocr()
             
-            # Extract text with EasyOCR
-            results = self._easyocr_reader.readtext(image, paragraph=True)
-            
-            # Combine all detected text
-            extracted_text = []
-            for (bbox, text, confidence) in results:
-                # Filter out low confidence detections
-                if confidence > 0.3:
-                    extracted_text.append(text)
+            # Extract text with EasyOCR in a single detection/recognition pass
+            results = self._easyocr_reader.readtext(image, paragraph=False)
             
-            return ' '.join(extracted_text)
+            # Build paragraph and word layouts from the same boxes and keep the better one
+            return select_text(results, confidence_threshold=0.3)
         except Exception as e:
             raise RuntimeError(f"EasyOCR failed: {str(e)}")
     
@@ -218,31 +215,33 @@ class OCRProcessor:
             raise RuntimeError("PIL (Pillow) required for image processing. Install with: pip install pillow")
         
         try:
-            # Handle different input types
-            if isinstance(image_input, bytes):
-                image = Image.open(io.BytesIO(image_input))
-            elif isinstance(image_input, Image.Image):
-                image = image_input
-            elif NUMPY_AVAILABLE and isinstance(image_input, np.ndarray):
-                image = Image.fromarray(image_input)
-            else:
-                raise ValueError("Unsupported image input type or NumPy not available")
-            
-            # Convert to numpy array for processing
-            if not NUMPY_AVAILABLE:
-                raise RuntimeError("NumPy required for image processing. Install with: pip install numpy")
-            
-            img_array = np.array(image)
-            
-            # Preprocess image if requested
             if preprocess:
-                img_array = self.preprocess_image(img_array)
+                # The preprocessor decodes every input type straight to grayscale
+                img_array = self.preprocess_image(image_input)
+            else:
+                # Handle different input types
+                if isinstance(image_input, bytes):
+                    image = Image.open(io.BytesIO(image_input))
+                elif isinstance(image_input, Image.Image):
+                    image = image_input
+                elif NUMPY_AVAILABLE and isinstance(image_input, np.ndarray):
+                    image = Image.fromarray(image_input)
+                else:
+                    raise ValueError("Unsupported image input type or NumPy not available")
+                
+                # Convert to numpy array for processing
+                if not NUMPY_AVAILABLE:
+                    raise RuntimeError("NumPy required for image processing. Install with: pip install numpy")
+                
+                img_array = np.array(image)
             
             # Extract text based on selected engine
             if self.engine == OCREngine.TESSERACT:
                 text = self.extract_text_tesseract(img_array)
             elif self.engine == OCREngine.EASYOCR:
                 text = self.extract_text_easyocr(img_array)
+            elif self.engine == OCREngine.TESSEROCR:
+                text = self.extract_text_tesserocr(img_array)
             else:
                 raise ValueError(f"Unsupported OCR engine: {self.engine}")
             
@@ -282,26 +281,36 @@ class OCRProcessor:
         
         return cleaned_text
     
-    def process_multiple_images(self, images: list, preprocess: bool = True) -> str:
+    def process_multiple_images(self, images: list, preprocess: bool = True, workers: int = 1) -> str:
         """
         Process multiple images and combine extracted text
         
         Args:
             images: List of images (any supported format)
             preprocess: Whether to apply preprocessing
+            workers: Number of worker processes to spread pages across (1 processes them in order here)
             
         Returns:
             Combined extracted text
         """
         all_text = []
         
-        for i, image in enumerate(images):
-            try:
-                text = self.process_image(image, preprocess)
-                if text.strip():
-                    all_text.append(f"--- Page {i+1} ---\n{text}")
-            except Exception as e:
-                all_text.append(f"--- Page {i+1} (Error) ---\nFailed to process: {str(e)}")
+        if workers > 1 and len(images) > 1:
+            from .parallel_ocr import get_parallel_ocr
+            pages = get_parallel_ocr(workers, self.engine.value).process_pages(images, preprocess=preprocess)
+        else:
+            pages = []
+            for image in images:
+                try:
+                    pages.append((self.process_image(image, preprocess), None))
+                except Exception as e:
+                    pages.append(("", str(e)))
+        
+        for i, (text, error) in enumerate(pages):
+            if error is not None:
+                all_text.append(f"--- Page {i+1} (Error) ---\nFailed to process: {error}")
+            elif text.strip():
+                all_text.append(f"--- Page {i+1} ---\n{text}")
         
         return '\n\n'.join(all_text)
 
@@ -327,6 +336,10 @@ def get_available_engines() -> list:
     if EASYOCR_AVAILABLE:
         available.append(OCREngine.EASYOCR)
     
+    # Check in-process Tesseract
+    if TESSEROCR_AVAILABLE:
+        available.append(OCREngine.TESSEROCR)
+    
     return available
 
 
@@ -342,5 +355,6 @@ def check_ocr_dependencies() -> dict:
         'opencv': CV2_AVAILABLE,
         'numpy': NUMPY_AVAILABLE,
         'tesseract': TESSERACT_AVAILABLE,
-        'easyocr': EASYOCR_AVAILABLE
+        'easyocr': EASYOCR_AVAILABLE,
+        'tesserocr': TESSEROCR_AVAILABLE
     }
@@ -0,0 +1,421 @@
+"""
+Out-of-process OCR service: a worker daemon and its client
+
+The worker loads the OCR engine (and torch) in its own process and serves
+jobs over a local socket, so web processes stay small and an OCR crash
+cannot take the UI down.
+
+Each message is one frame:
+
+    !IQ header  -- JSON metadata length, total payload length
+    metadata    -- UTF-8 JSON (operation, page sizes, results)
+    payload     -- page image bytes, back to back
+
+Image bytes are sent straight from the caller's buffers with scatter/gather
+writes and received into one preallocated buffer, so they are not
+concatenated on the way through the socket. The worker copies each page
+out of that buffer once before handing it to the engine, which expects
+bytes.
+"""
+from typing import List, Optional, Sequence, Tuple, Union
+import io
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+from .lazy_imports import is_available, lazy_import
+
+Image = lazy_import("PIL.Image")
+PIL_AVAILABLE = is_available("PIL")
+
+
+FRAME_HEADER = struct.Struct("!IQ")
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+
+# Largest frame accepted from the other side; the header is untrusted
+MAX_FRAME_BYTES = int(float(os.getenv("OCR_SERVICE_MAX_FRAME_MB", "256")) * 1024 * 1024)
+
+
+class FrameTooLarge(ValueError):
+    """Raised when a frame header announces more than the allowed size"""
+
+
+class ReplyInterrupted(ConnectionError):
+    """Raised when the connection drops after part of a frame has arrived"""
+
+
+def parse_address(address: str) -> Tuple[int, Union[str, Tuple[str, int]]]:
+    """
+    Parse a service address
+
+    Args:
+        address: "unix:/path/to/socket" or "host:port"
+
+    Returns:
+        (socket family, address for connect/bind)
+    """
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:"):]
+
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+def send_frame(sock: socket.socket, metadata: dict, buffers: Sequence = ()):
+    """Send metadata and payload buffers as one frame without joining the buffers"""
+    encoded = json.dumps(metadata).encode("utf-8")
+    views = [memoryview(buffer).cast("B") for buffer in buffers]
+    header = FRAME_HEADER.pack(len(encoded), sum(view.nbytes for view in views))
+
+    if not hasattr(sock, "sendmsg"):
+        # No scatter/gather I/O (Windows); send the pieces one after another
+        for piece in [header, encoded, *views]:
+            sock.sendall(piece)
+        return
+
+    pending = [memoryview(header), memoryview(encoded), *views]
+    while pending:
+        sent = sock.sendmsg(pending)
+        while pending and sent >= pending[0].nbytes:
+            sent -= pending[0].nbytes
+            pending.pop(0)
+        if pending and sent:
+            pending[0] = pending[0][sent:]
+
+
+def _recv_into(sock: socket.socket, view: memoryview):
+    """Fill the view from the socket"""
+    total = view.nbytes
+    while view.nbytes:
+        received = sock.recv_into(view)
+        if not received:
+            if view.nbytes == total:
+                raise ConnectionError("OCR service connection closed")
+            raise ReplyInterrupted("OCR service connection closed in the middle of a frame")
+        view = view[received:]
+
+
+def recv_frame(sock: socket.socket, max_bytes: int = None) -> Tuple[dict, memoryview]:
+    """
+    Receive one frame, returning its metadata and a view of its payload
+
+    Args:
+        sock: Connected socket
+        max_bytes: Largest metadata plus payload size accepted (defaults to MAX_FRAME_BYTES)
+
+    Raises:
+        ConnectionError: The connection closed before the frame started
+        ReplyInterrupted: The connection closed after part of the frame arrived
+        FrameTooLarge: The header announced more than max_bytes
+    """
+    max_bytes = MAX_FRAME_BYTES if max_bytes is None else max_bytes
+
+    header = bytearray(FRAME_HEADER.size)
+    _recv_into(sock, memoryview(header))
+    metadata_length, payload_length = FRAME_HEADER.unpack(header)
+    if metadata_length + payload_length > max_bytes:
+        raise FrameTooLarge(f"Frame of {metadata_length + payload_length} bytes exceeds the {max_bytes} byte limit")
+
+    try:
+        metadata = bytearray(metadata_length)
+        _recv_into(sock, memoryview(metadata))
+
+        payload = bytearray(payload_length)
+        _recv_into(sock, memoryview(payload))
+    except ConnectionError as e:
+        raise ReplyInterrupted(str(e)) from e
+
+    return json.loads(metadata.decode("utf-8")), memoryview(payload)
+
+
+def split_payload(payload: memoryview, sizes: List[int]) -> List[memoryview]:
+    """Split a frame payload into per-page views"""
+    pages = []
+    offset = 0
+    for size in sizes:
+        pages.append(payload[offset:offset + size])
+        offset += size
+    return pages
+
+
+class OCRService:
+    """
+    OCR engine hosted by the worker daemon
+
+    Wraps SimpleOCR through the shared engine, or an OCRProcessor for any
+    other OCREngine value. Calls are serialized because the engines are not
+    safe for concurrent use.
+    """
+
+    def __init__(self, engine: str = "simple"):
+        """
+        Initialize the hosted engine
+
+        Args:
+            engine: "simple" for SimpleOCR, or an OCREngine value for OCRProcessor
+        """
+        self.engine = engine
+        self._lock = threading.Lock()
+
+        if engine == "simple":
+            from .shared_engine import SharedOCR
+            self._shared = SharedOCR(idle_timeout=0)
+            self._processor = None
+        else:
+            from .ocr_processor import OCRProcessor, OCREngine
+            self._shared = None
+            self._processor = OCRProcessor(engine=OCREngine(engine))
+
+    def load(self):
+        """Load and warm up the hosted engine (the OCRProcessor is built on initialization)"""
+        if self._shared is not None:
+            self._shared.warm_up()
+
+    def extract_text(self, image: bytes) -> str:
+        """Extract text from one page"""
+        if self._shared is not None:
+            return self._shared.extract_text(image)
+        with self._lock:
+            return self._processor.process_image(image)
+
+    def extract_text_batch(self, images: List[bytes], batch_size: int = 16) -> List[Tuple[str, str]]:
+        """Extract (text, error) per page"""
+        if self._shared is not None:
+            return self._shared.extract_text_batch(images, batch_size=batch_size)
+
+        pages = []
+        for image in images:
+            try:
+                pages.append((self.extract_text(image), None))
+            except Exception as e:
+                pages.append(("", str(e)))
+        return pages
+
+    def get_status(self) -> dict:
+        """Get the status of the hosted engine"""
+        if self._shared is not None:
+            return self._shared.get_status()
+
+        from .ocr_processor import OCREngine
+        return {
+            'easyocr_available': self._processor.engine == OCREngine.EASYOCR,
+            'tesseract_available': self._processor.engine in (OCREngine.TESSERACT, OCREngine.TESSEROCR),
+            'pil_available': PIL_AVAILABLE,
+            'state': 'ready'
+        }
+
+    def handle(self, metadata: dict, payload: memoryview) -> dict:
+        """Run one job and build its reply"""
+        operation = metadata.get("op")
+        # One copy per page: the engines and the OCR cache take bytes
+        pages = [bytes(view) for view in split_payload(payload, metadata.get("sizes", []))]
+
+        if operation == "extract_text":
+            return {"ok": True, "text": self.extract_text(pages[0])}
+        if operation == "extract_text_batch":
+            results = self.extract_text_batch(pages, batch_size=metadata.get("batch_size", 16))
+            return {"ok": True, "pages": [list(page) for page in results]}
+        if operation == "status":
+            return {"ok": True, "status": self.get_status()}
+        if operation == "ping":
+            return {"ok": True}
+
+        return {"ok": False, "error": f"Unknown operation: {operation}"}
+
+
+class _JobHandler(socketserver.BaseRequestHandler):
+    """Serve jobs on one client connection until it closes"""
+
+    def handle(self):
+        while True:
+            try:
+                metadata, payload = recv_frame(self.request)
+            except FrameTooLarge as e:
+                # The rest of the frame is not read, so the connection cannot be reused
+                try:
+                    send_frame(self.request, {"ok": False, "error": str(e)})
+                except OSError:
+                    pass
+                return
+            except (ConnectionError, OSError, ValueError):
+                return
+
+            try:
+                reply = self.server.service.handle(metadata, payload)
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+
+            try:
+                send_frame(self.request, reply)
+            except OSError:
+                return
+
+
+def serve(address: str = DEFAULT_ADDRESS, engine: str = "simple"):
+    """
+    Run the OCR worker daemon until interrupted
+
+    Args:
+        address: "unix:/path/to/socket" or "host:port" to listen on
+        engine: "simple" for SimpleOCR, or an OCREngine value for OCRProcessor
+    """
+    family, bind_address = parse_address(address)
+
+    if family == socket.AF_UNIX:
+        if os.path.exists(bind_address):
+            os.remove(bind_address)
+        server_class = socketserver.ThreadingUnixStreamServer
+    else:
+        server_class = socketserver.ThreadingTCPServer
+
+    server_class.daemon_threads = True
+    server_class.allow_reuse_address = True
+
+    with server_class(bind_address, _JobHandler) as server:
+        server.service = OCRService(engine)
+        # Load the engine in the background so status calls are answered
+        # ('warming') while it loads; jobs wait for the load to finish
+        threading.Thread(target=server.service.load, name="ocr-load", daemon=True).start()
+        server.serve_forever()
+
+
+class RemoteOCR:
+    """
+    Client for the OCR worker daemon
+
+    Offers the same extract_text / extract_text_batch / get_status calls as
+    the shared in-process engine, so the app can use either. Each thread
+    keeps its own connection. A job is sent again once if the connection
+    was refused, reset or closed before any reply arrived (e.g. a stale
+    connection to a restarted worker), but never after a timeout or a
+    partial reply, when the worker may still be running it.
+
+    get_status is called on every page render, so it uses a short timeout
+    and its result is reused for status_ttl seconds.
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: float = 300.0,
+                 status_timeout: float = 2.0, status_ttl: float = 10.0):
+        """
+        Initialize the client
+
+        Args:
+            address: "unix:/path/to/socket" or "host:port" of the worker daemon
+            timeout: Seconds to wait for a job's reply
+            status_timeout: Seconds to wait for a status reply
+            status_ttl: Seconds a status reply is reused before asking again
+        """
+        self.address = address
+        self.timeout = timeout
+        self.status_timeout = status_timeout
+        self.status_ttl = status_ttl
+        self._local = threading.local()
+        self._status = None
+        self._status_time = 0.0
+
+    def _connect(self, timeout: float) -> socket.socket:
+        """Return this thread's connection, opening it if needed"""
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            family, connect_address = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(timeout)
+            sock.connect(connect_address)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        """Close this thread's connection"""
+        sock = getattr(self._local, "sock", None)
+        self._local.sock = None
+        if sock is not None:
+            sock.close()
+
+    @staticmethod
+    def _to_bytes(image_input) -> Union[bytes, memoryview]:
+        """Encoded image bytes for a page (upload bytes are passed through untouched)"""
+        if isinstance(image_input, (bytes, bytearray, memoryview)):
+            return image_input
+        if PIL_AVAILABLE and isinstance(image_input, Image.Image):
+            buffer = io.BytesIO()
+            image_input.save(buffer, format="PNG")
+            return buffer.getbuffer()
+        raise ValueError("Unsupported image input type for the OCR service")
+
+    def _call(self, metadata: dict, pages: Sequence = (), timeout: float = None) -> dict:
+        """Send a job and wait for its reply, reconnecting once if the connection dropped before a reply"""
+        buffers = [self._to_bytes(page) for page in pages]
+        metadata = {**metadata, "sizes": [memoryview(buffer).nbytes for buffer in buffers]}
+        timeout = self.timeout if timeout is None else timeout
+
+        for attempt in range(2):
+            try:
+                sock = self._connect(timeout)
+                sock.settimeout(timeout)
+                send_frame(sock, metadata, buffers)
+                reply, _ = recv_frame(sock)
+                break
+            except socket.timeout as e:
+                self._close()
+                raise RuntimeError(f"OCR service at {self.address} did not reply within {timeout:g}s") from e
+            except (ReplyInterrupted, FrameTooLarge) as e:
+                self._close()
+                raise RuntimeError(f"OCR service at {self.address} sent an incomplete reply: {str(e)}") from e
+            except (ConnectionError, OSError) as e:
+                self._close()
+                if attempt:
+                    raise RuntimeError(f"OCR service unavailable at {self.address}: {str(e)}") from e
+
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "OCR service error"))
+        return reply
+
+    def extract_text(self, image_input) -> str:
+        """Extract text from one image in the worker daemon"""
+        return self._call({"op": "extract_text"}, [image_input])["text"]
+
+    def extract_text_batch(self, images: list, batch_size: int = 16) -> List[Tuple[str, str]]:
+        """Extract (text, error) per page in the worker daemon"""
+        reply = self._call({"op": "extract_text_batch", "batch_size": batch_size}, images)
+        return [tuple(page) for page in reply["pages"]]
+
+    def get_status(self) -> dict:
+        """Get the worker's OCR engine status (no engine available if it cannot be reached)"""
+        if self._status is not None and time.monotonic() - self._status_time < self.status_ttl:
+            return self._status
+
+        try:
+            status = self._call({"op": "status"}, timeout=self.status_timeout)["status"]
+        except RuntimeError:
+            status = {'easyocr_available': False, 'tesseract_available': False, 'pil_available': PIL_AVAILABLE,
+                      'state': 'unavailable'}
+        self._status, self._status_time = status, time.monotonic()
+        return status
+
+
+_remote_ocr = None
+_remote_lock = threading.Lock()
+
+
+def get_remote_ocr() -> Optional[RemoteOCR]:
+    """Return the client for the worker daemon at OCR_SERVICE_ADDRESS, or None to OCR in-process"""
+    global _remote_ocr
+
+    address = os.getenv("OCR_SERVICE_ADDRESS", "")
+    if not address:
+        return None
+
+    with _remote_lock:
+        if _remote_ocr is None or _remote_ocr.address != address:
+            _remote_ocr = RemoteOCR(
+                address,
+                timeout=float(os.getenv("OCR_SERVICE_TIMEOUT_SECONDS", "300")),
+                status_timeout=float(os.getenv("OCR_SERVICE_STATUS_TIMEOUT_SECONDS", "2")),
+                status_ttl=float(os.getenv("OCR_SERVICE_STATUS_TTL_SECONDS", "10"))
+            )
+        return _remote_ocr
@@ -0,0 +1,216 @@
+"""
+Page detection and region-of-interest cropping for photographed answer sheets
+"""
+from typing import Optional, Tuple
+
+from .lazy_imports import is_available, lazy_import
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+CV2_AVAILABLE = is_available("cv2") and is_available("numpy")
+
+
+def _downsample(gray: "np.ndarray", size: int) -> Tuple["np.ndarray", float]:
+    """Return a copy whose longest side is at most size pixels, and the scale applied"""
+    height, width = gray.shape[:2]
+    factor = min(1.0, size / max(height, width))
+    if factor == 1.0:
+        return gray, 1.0
+    return cv2.resize(gray, (max(1, int(width * factor)), max(1, int(height * factor))),
+                      interpolation=cv2.INTER_AREA), factor
+
+
+def order_corners(points: "np.ndarray") -> "np.ndarray":
+    """Order four corner points as top-left, top-right, bottom-right, bottom-left"""
+    points = points.reshape(4, 2).astype(np.float32)
+    sums = points.sum(axis=1)
+    diffs = np.diff(points, axis=1).ravel()
+    return np.array([
+        points[np.argmin(sums)],
+        points[np.argmin(diffs)],
+        points[np.argmax(sums)],
+        points[np.argmax(diffs)]
+    ], dtype=np.float32)
+
+
+class PageDetector:
+    """
+    Find the sheet of paper in a photo and crop it to the written area
+
+    Runs three cheap steps, each on a downsampled copy, and applies the
+    results to the full-resolution page:
+
+    1. Find the paper outline and correct its perspective
+    2. Correct the remaining skew of the text lines
+    3. Crop to the bounding box of the handwriting, dropping desk, margins
+       and shadows
+
+    Every step leaves the page unchanged when it finds nothing reliable.
+    """
+
+    def __init__(self, sample_size: int = 800, min_page_area: float = 0.25, max_skew: float = 10.0,
+                 margin: float = 0.02):
+        """
+        Initialize the page detector
+
+        Args:
+            sample_size: Longest side of the copies the steps analyse
+            min_page_area: Smallest share of the frame a detected page may cover
+            max_skew: Largest skew angle in degrees that is corrected
+            margin: Padding kept around the written area, as a share of the page size
+        """
+        if not CV2_AVAILABLE:
+            raise RuntimeError("OpenCV and NumPy required for page detection. Install with: pip install opencv-python numpy")
+
+        self.sample_size = sample_size
+        self.min_page_area = min_page_area
+        self.max_skew = max_skew
+        self.margin = margin
+
+    def find_page(self, gray: "np.ndarray") -> Optional["np.ndarray"]:
+        """
+        Find the four corners of the paper in the frame
+
+        Args:
+            gray: Grayscale uint8 photo
+
+        Returns:
+            Corners in page coordinates ordered clockwise from top-left, or None
+        """
+        sample, factor = _downsample(gray, self.sample_size)
+        edges = cv2.Canny(cv2.GaussianBlur(sample, (5, 5), 0), 50, 150)
+        edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+
+        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        frame_area = sample.shape[0] * sample.shape[1]
+
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            area = cv2.contourArea(contour)
+            if area < self.min_page_area * frame_area:
+                break
+
+            approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+            if len(approx) == 4 and cv2.isContourConvex(approx):
+                # A page filling the frame needs no perspective correction
+                if area > 0.95 * frame_area:
+                    return None
+                return order_corners(approx) / factor
+
+        return None
+
+    @staticmethod
+    def warp_page(gray: "np.ndarray", corners: "np.ndarray") -> "np.ndarray":
+        """Warp the quadrilateral given by the corners to an upright rectangle"""
+        top_left, top_right, bottom_right, bottom_left = corners
+        width = int(max(np.linalg.norm(top_right - top_left), np.linalg.norm(bottom_right - bottom_left)))
+        height = int(max(np.linalg.norm(bottom_left - top_left), np.linalg.norm(bottom_right - top_right)))
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+
+        matrix = cv2.getPerspectiveTransform(corners, target)
+        return cv2.warpPerspective(gray, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                                   borderMode=cv2.BORDER_REPLICATE)
+
+    @staticmethod
+    def _ink(sample: "np.ndarray") -> "np.ndarray":
+        """Binary mask of dark strokes, robust to uneven lighting and shadows"""
+        ink = cv2.adaptiveThreshold(sample, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 25, 15)
+        return cv2.morphologyEx(ink, cv2.MORPH_OPEN, np.ones((2, 2), np.uint8))
+
+    def estimate_skew(self, gray: "np.ndarray") -> float:
+        """
+        Estimate the skew of the text lines in degrees
+
+        Tries rotations of the ink mask and keeps the one whose row
+        profile is sharpest, i.e. where lines and gaps separate best.
+        """
+        sample, _ = _downsample(gray, self.sample_size)
+        ink = self._ink(sample)
+        if not ink.any():
+            return 0.0
+
+        center = (sample.shape[1] / 2, sample.shape[0] / 2)
+
+        def sharpness(angle: float) -> float:
+            matrix = cv2.getRotationMatrix2D(center, angle, 1.0)
+            rotated = cv2.warpAffine(ink, matrix, (sample.shape[1], sample.shape[0]), flags=cv2.INTER_NEAREST)
+            return float(np.var(rotated.sum(axis=1, dtype=np.float64)))
+
+        # Coarse search over the whole range, then refine around the best angle
+        best = max(np.arange(-self.max_skew, self.max_skew + 0.5, 1.0), key=sharpness)
+        best = max(np.arange(best - 1.0, best + 1.01, 0.2), key=sharpness)
+        return float(best)
+
+    @staticmethod
+    def rotate(gray: "np.ndarray", angle: float) -> "np.ndarray":
+        """Rotate the page by angle degrees, filling the corners with the border colour"""
+        height, width = gray.shape[:2]
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        return cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def find_text_region(self, gray: "np.ndarray") -> Optional[Tuple[int, int, int, int]]:
+        """
+        Find the bounding box of the written area
+
+        Args:
+            gray: Grayscale uint8 page
+
+        Returns:
+            (x_min, y_min, x_max, y_max) in page coordinates, or None
+        """
+        sample, factor = _downsample(gray, self.sample_size)
+        ink = self._ink(sample)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+
+        height, width = sample.shape[:2]
+        boxes = []
+        min_line = min(width, height) / 5
+        for x, y, w, h, area in stats[1:count]:
+            # Page borders, shadows and desk edges are frame-sized, and ruled
+            # lines and table edges are long and thin; anything else is kept,
+            # including strokes written close to the margin
+            frame_sized = h > height / 5 or w > width / 2
+            thin_line = max(w, h) >= min_line and max(w, h) >= 20 * min(w, h)
+            if area < 8 or frame_sized or thin_line:
+                continue
+            boxes.append((x, y, x + w, y + h))
+
+        if len(boxes) < 5:
+            return None
+
+        boxes = np.array(boxes)
+        x_min, y_min = boxes[:, 0].min(), boxes[:, 1].min()
+        x_max, y_max = boxes[:, 2].max(), boxes[:, 3].max()
+
+        pad_x, pad_y = int(self.margin * width), int(self.margin * height)
+        x_min, y_min = max(0, x_min - pad_x), max(0, y_min - pad_y)
+        x_max, y_max = min(width, x_max + pad_x), min(height, y_max + pad_y)
+
+        return tuple(int(round(value / factor)) for value in (x_min, y_min, x_max, y_max))
+
+    def detect(self, gray: "np.ndarray") -> "np.ndarray":
+        """
+        Straighten the page and crop it to its written area
+
+        Args:
+            gray: Grayscale uint8 photo
+
+        Returns:
+            Cropped grayscale page (the input itself when nothing was found)
+        """
+        corners = self.find_page(gray)
+        if corners is not None:
+            gray = self.warp_page(gray, corners)
+
+        angle = self.estimate_skew(gray)
+        if abs(angle) >= 0.5:
+            gray = self.rotate(gray, angle)
+
+        region = self.find_text_region(gray)
+        if region is not None:
+            x_min, y_min, x_max, y_max = region
+            # A tiny region is more likely noise than the essay
+            if (x_max - x_min) * (y_max - y_min) >= 0.05 * gray.shape[0] * gray.shape[1]:
+                gray = gray[y_min:y_max, x_min:x_max]
+
+        return np.ascontiguousarray(gray)
@@ -0,0 +1,179 @@
+"""
+Page-parallel OCR using a pool of worker processes
+"""
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, List, Tuple, Union
+import multiprocessing
+import os
+import threading
+
+
+# OCR engine loaded once in each worker process, and its text extraction function
+_worker_engine = None
+_worker_extract = None
+
+
+def _init_worker(engine: str, threads: int):
+    """Limit per-worker threading and load the OCR engine once"""
+    global _worker_engine, _worker_extract
+
+    # Without limits every worker would start one thread per core in torch,
+    # OpenCV and Tesseract and the pool would oversubscribe the CPU
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["OMP_THREAD_LIMIT"] = str(threads)
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+    try:
+        import cv2
+        cv2.setNumThreads(threads)
+    except ImportError:
+        pass
+
+    if engine == "simple":
+        from .simple_ocr import SimpleOCR
+        _worker_engine = SimpleOCR()
+        _worker_extract = _worker_engine.extract_text
+    else:
+        from .ocr_processor import OCRProcessor, OCREngine
+        _worker_engine = OCRProcessor(engine=OCREngine(engine))
+        _worker_extract = _worker_engine.process_image
+
+
+def _warm_worker(_=None) -> int:
+    """Run the worker engine's dummy inference, returning the worker's pid"""
+    if hasattr(_worker_engine, 'warm_up'):
+        _worker_engine.warm_up()
+    return os.getpid()
+
+
+def _ocr_page(page: Tuple[int, object, dict]) -> Tuple[int, str, str]:
+    """OCR one page in a worker, returning (index, text, error)"""
+    index, image, options = page
+    try:
+        return index, _worker_extract(image, **options), None
+    except Exception as e:
+        return index, "", str(e)
+
+
+class ParallelOCR:
+    """
+    Spread the pages of an essay across a pool of OCR worker processes
+
+    Each worker loads its OCR model once and keeps it for the life of the
+    pool. Results are always returned in page order.
+    """
+
+    def __init__(self, workers: int = None, engine: str = "simple"):
+        """
+        Initialize the parallel OCR pool
+
+        Args:
+            workers: Number of worker processes (defaults to half the CPU cores, at most 4)
+            engine: "simple" for SimpleOCR, or an OCREngine value for OCRProcessor
+        """
+        cpu_count = os.cpu_count() or 1
+        self.workers = workers or max(1, min(4, cpu_count // 2))
+        self.threads_per_worker = max(1, cpu_count // self.workers)
+        self.engine = engine
+        self._executor = None
+        self._warm = False
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Start the worker pool on first use"""
+        with self._lock:
+            if self._executor is None:
+                # Spawn rather than fork so workers do not inherit torch thread state
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.engine, self.threads_per_worker)
+                )
+            return self._executor
+
+    def warm_up(self):
+        """
+        Start every worker process and load its OCR engine now
+
+        The tasks are submitted together, before any worker has started, so
+        the pool spawns one process per task and each loads its engine.
+        """
+        executor = self._get_executor()
+        try:
+            list(executor.map(_warm_worker, range(self.workers)))
+        except BrokenProcessPool as e:
+            self.shutdown()
+            raise RuntimeError(f"OCR worker process crashed: {str(e)}")
+        self._warm = True
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether warm_up() has loaded the engine in every worker of the current pool"""
+        return self._warm
+
+    def iter_pages(self, images: List[Union[bytes, object]], **options) -> Iterator[Tuple[int, str, str]]:
+        """
+        OCR pages in parallel, yielding results in page order
+
+        Args:
+            images: Page images (bytes, PIL Images or numpy arrays)
+            **options: Extra keyword arguments for the engine's extraction call
+
+        Yields:
+            (index, text, error) for each page; error is None on success
+        """
+        executor = self._get_executor()
+        futures = [executor.submit(_ocr_page, (index, image, options)) for index, image in enumerate(images)]
+
+        try:
+            for future in futures:
+                yield future.result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. out of memory); start a fresh pool next time
+            self.shutdown()
+            raise RuntimeError(f"OCR worker process crashed: {str(e)}")
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def process_pages(self, images: list, **options) -> List[Tuple[str, str]]:
+        """OCR pages in parallel and return (text, error) per page in page order"""
+        return [(text, error) for _, text, error in self.iter_pages(images, **options)]
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            self._warm = False
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_parallel_ocr(workers: int = None, engine: str = "simple") -> ParallelOCR:
+    """Return a process-wide parallel OCR pool for the given settings"""
+    key = (workers, engine)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ParallelOCR(workers, engine)
+        return _pools[key]
+
+
+def get_configured_workers() -> int:
+    """Return the number of OCR worker processes configured by OCR_WORKERS (1 disables parallel OCR)"""
+    return max(1, int(os.getenv("OCR_WORKERS", "1")))
+
+
+def get_configured_batch_size() -> int:
+    """Return the recognizer batch size configured by OCR_BATCH_SIZE (0 disables batched OCR)"""
+    return max(0, int(os.getenv("OCR_BATCH_SIZE", "0")))
@@ -0,0 +1,296 @@
+"""
+Single-pass grayscale preprocessing for OCR on one uint8 buffer
+"""
+from enum import Enum
+from typing import Callable, List, Tuple, Union
+import io
+import time
+
+from .lazy_imports import is_available, lazy_import
+from .page_detection import PageDetector
+
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+CV2_AVAILABLE = is_available("cv2") and is_available("numpy")
+
+Image = lazy_import("PIL.Image")
+PIL_AVAILABLE = is_available("PIL")
+
+
+class DenoiseMode(Enum):
+    """Available denoising strategies"""
+    AUTO = "auto"
+    NLM = "nlm"
+    BILATERAL = "bilateral"
+    MEDIAN = "median"
+    OFF = "off"
+
+
+def estimate_noise(gray: "np.ndarray", sample_size: int = 800) -> float:
+    """
+    Estimate the standard deviation of pixel noise on a page
+
+    The page is subsampled by striding, which keeps per-pixel noise intact
+    unlike an averaging resize, and filtered with a Laplacian-difference
+    kernel. The median absolute response ignores the minority of pixels on
+    text edges.
+
+    Args:
+        gray: Grayscale uint8 page
+        sample_size: Longest side of the analysed copy
+
+    Returns:
+        Estimated noise sigma in gray levels
+    """
+    step = max(1, max(gray.shape[:2]) // sample_size)
+    sample = gray[::step, ::step].astype(np.float32)
+
+    kernel = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+    response = np.abs(cv2.filter2D(sample, -1, kernel)[1:-1, 1:-1])
+    if not response.size:
+        return 0.0
+
+    # The kernel's L2 norm is 6; 0.6745 converts a median absolute deviation to sigma
+    return float(np.median(response)) / 0.6745 / 6
+
+
+class Preprocessor:
+    """
+    Image preprocessing engine returning the array the OCR engines take
+
+    The page is converted to grayscale as it is loaded, and every later
+    stage works on that single uint8 buffer, in place where OpenCV allows.
+    Stages that would not change the image are skipped entirely.
+    """
+
+    def __init__(self, min_size: int = 1000, contrast: float = 1.5, sharpness: float = 2.0,
+                 denoise: Union[bool, str, DenoiseMode] = DenoiseMode.OFF, binarize: bool = True, block_size: int = 11, offset: int = 2,
+                 normalize: bool = True, target_text_height: int = 32, max_pixels: int = 8_000_000,
+                 detect_page: bool = True):
+        """
+        Initialize the preprocessing engine
+
+        Args:
+            min_size: Upscale pages whose width or height is below this when the
+                text height cannot be estimated (0 disables)
+            contrast: Contrast factor around the mean gray level (1.0 disables)
+            sharpness: Sharpness factor, as PIL's ImageEnhance.Sharpness (1.0 disables)
+            denoise: Denoising strategy; AUTO picks one from the estimated noise
+                level (True means NLM, False means OFF)
+            binarize: Whether to apply adaptive thresholding
+            block_size: Neighbourhood size for adaptive thresholding
+            offset: Constant subtracted from the neighbourhood mean when thresholding
+            normalize: Whether to resample pages so their text is target_text_height pixels high
+            target_text_height: Text height in pixels the OCR engines read best
+            max_pixels: Upper bound on the pixel count of a normalized page
+            detect_page: Whether to straighten the sheet and crop it to the written area first
+        """
+        if not CV2_AVAILABLE:
+            raise RuntimeError("OpenCV and NumPy required for image preprocessing. Install with: pip install opencv-python numpy")
+
+        self.min_size = min_size
+        self.contrast = contrast
+        self.sharpness = sharpness
+        if isinstance(denoise, bool):
+            denoise = DenoiseMode.NLM if denoise else DenoiseMode.OFF
+        self.denoise = DenoiseMode(denoise)
+        self.binarize = binarize
+        self.block_size = block_size
+        self.offset = offset
+        self.normalize = normalize
+        self.target_text_height = target_text_height
+        self.max_pixels = max_pixels
+        self.page_detector = PageDetector() if detect_page else None
+
+    @staticmethod
+    def load(image_input: Union[bytes, "Image.Image", "np.ndarray"]) -> "np.ndarray":
+        """Decode or convert the input straight to a contiguous grayscale uint8 array"""
+        if isinstance(image_input, bytes):
+            gray = cv2.imdecode(np.frombuffer(image_input, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+            if gray is not None:
+                return gray
+            # Formats OpenCV cannot decode still go through PIL
+            image_input = Image.open(io.BytesIO(image_input))
+
+        if PIL_AVAILABLE and isinstance(image_input, Image.Image):
+            if image_input.mode != 'L':
+                image_input = image_input.convert('L')
+            return np.array(image_input, dtype=np.uint8)
+
+        if isinstance(image_input, np.ndarray):
+            if image_input.ndim == 3:
+                code = cv2.COLOR_RGBA2GRAY if image_input.shape[2] == 4 else cv2.COLOR_RGB2GRAY
+                return cv2.cvtColor(image_input, code)
+            return np.ascontiguousarray(image_input, dtype=np.uint8).copy()
+
+        raise ValueError("Unsupported image input type")
+
+    def upscale(self, gray: "np.ndarray") -> "np.ndarray":
+        """Upscale small pages, since OCR works better on larger text"""
+        height, width = gray.shape[:2]
+        if not self.min_size or (width >= self.min_size and height >= self.min_size):
+            return gray
+
+        scale = max(self.min_size / width, self.min_size / height)
+        return cv2.resize(gray, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_LANCZOS4)
+
+    @staticmethod
+    def estimate_text_height(gray: "np.ndarray", sample_size: int = 1000) -> float:
+        """
+        Estimate the typical character height of a page from connected components
+
+        The page is analysed on a copy downsampled to at most sample_size
+        pixels per side, so the estimate stays cheap on large photos.
+
+        Args:
+            gray: Grayscale uint8 page
+            sample_size: Longest side of the analysed copy
+
+        Returns:
+            Median component height in page pixels, or 0.0 if there is no text-like component
+        """
+        height, width = gray.shape[:2]
+        factor = min(1.0, sample_size / max(height, width))
+        sample = gray
+        if factor < 1.0:
+            sample = cv2.resize(gray, (max(1, int(width * factor)), max(1, int(height * factor))),
+                                interpolation=cv2.INTER_AREA)
+
+        _, ink = cv2.threshold(sample, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(ink, connectivity=8)
+        if count <= 1:
+            return 0.0
+
+        # Skip the background label, specks, and blobs too large or too flat to be characters
+        stats = stats[1:]
+        heights = stats[:, cv2.CC_STAT_HEIGHT]
+        widths = stats[:, cv2.CC_STAT_WIDTH]
+        sample_height = sample.shape[0]
+        text_like = (
+            (heights >= 3) & (heights <= sample_height / 8)
+            & (stats[:, cv2.CC_STAT_AREA] >= 4) & (widths <= heights * 15)
+        )
+        if text_like.sum() < 10:
+            return 0.0
+
+        return float(np.median(heights[text_like])) / factor
+
+    def normalize_resolution(self, gray: "np.ndarray") -> "np.ndarray":
+        """Resample the page so its text is about target_text_height pixels high"""
+        height, width = gray.shape[:2]
+        text_height = self.estimate_text_height(gray)
+
+        if text_height > 0:
+            scale = min(4.0, max(0.25, self.target_text_height / text_height))
+        elif self.min_size and (width < self.min_size or height < self.min_size):
+            scale = max(self.min_size / width, self.min_size / height)
+        else:
+            scale = 1.0
+
+        # Large photos are capped even when their text is small
+        scale = min(scale, (self.max_pixels / (width * height)) ** 0.5)
+
+        # Resampling by a few percent costs more than it gains
+        if abs(scale - 1.0) < 0.15:
+            return gray
+
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_LANCZOS4
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        return cv2.resize(gray, size, interpolation=interpolation)
+
+    def enhance_contrast(self, gray: "np.ndarray") -> "np.ndarray":
+        """Stretch gray levels around the mean, in place"""
+        mean = int(cv2.mean(gray)[0] + 0.5)
+        cv2.addWeighted(gray, self.contrast, gray, 0.0, mean * (1.0 - self.contrast), dst=gray)
+        return gray
+
+    def sharpen(self, gray: "np.ndarray") -> "np.ndarray":
+        """Sharpen against a smoothed copy, in place"""
+        kernel = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+        smoothed = cv2.filter2D(gray, -1, kernel)
+        cv2.addWeighted(gray, self.sharpness, smoothed, 1.0 - self.sharpness, 0.0, dst=gray)
+        return gray
+
+    # Noise sigma below which each strategy is chosen in AUTO mode; heavier noise uses NLM
+    NOISE_LEVELS = (
+        (2.5, DenoiseMode.OFF),
+        (6.0, DenoiseMode.MEDIAN),
+        (12.0, DenoiseMode.BILATERAL),
+    )
+
+    def choose_denoise(self, gray: "np.ndarray") -> Tuple[DenoiseMode, float]:
+        """Return the denoising strategy for the page and its estimated noise sigma"""
+        sigma = estimate_noise(gray)
+        if self.denoise != DenoiseMode.AUTO:
+            return self.denoise, sigma
+
+        for limit, mode in self.NOISE_LEVELS:
+            if sigma < limit:
+                return mode, sigma
+        return DenoiseMode.NLM, sigma
+
+    def remove_noise(self, gray: "np.ndarray") -> "np.ndarray":
+        """Reduce noise with the configured, or automatically chosen, strategy"""
+        mode, sigma = self.choose_denoise(gray)
+
+        if mode == DenoiseMode.NLM:
+            return cv2.fastNlMeansDenoising(gray, h=min(15.0, max(3.0, sigma)))
+        if mode == DenoiseMode.BILATERAL:
+            return cv2.bilateralFilter(gray, 5, max(20.0, sigma * 4), 5)
+        if mode == DenoiseMode.MEDIAN:
+            return cv2.medianBlur(gray, 3)
+        return gray
+
+    def threshold(self, gray: "np.ndarray") -> "np.ndarray":
+        """Binarize with adaptive Gaussian thresholding, in place"""
+        cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY,
+            self.block_size, self.offset, dst=gray
+        )
+        return gray
+
+    @property
+    def stages(self) -> List[Tuple[str, Callable]]:
+        """Enabled stages after loading, in the order they run"""
+        stages = []
+        if self.page_detector is not None:
+            stages.append(("page", self.page_detector.detect))
+        if self.normalize:
+            stages.append(("normalize", self.normalize_resolution))
+        elif self.min_size:
+            stages.append(("upscale", self.upscale))
+        if self.contrast != 1.0:
+            stages.append(("contrast", self.enhance_contrast))
+        if self.sharpness != 1.0:
+            stages.append(("sharpen", self.sharpen))
+        if self.denoise != DenoiseMode.OFF:
+            stages.append(("denoise", self.remove_noise))
+        if self.binarize:
+            stages.append(("threshold", self.threshold))
+        return stages
+
+    def run(self, image_input: Union[bytes, "Image.Image", "np.ndarray"], timings: dict = None) -> "np.ndarray":
+        """
+        Preprocess an image for OCR
+
+        Args:
+            image_input: Image input (bytes, PIL Image, or numpy array)
+            timings: Optional dict that receives the seconds spent in each stage
+
+        Returns:
+            Preprocessed grayscale uint8 array
+        """
+        start = time.perf_counter()
+        gray = self.load(image_input)
+        if timings is not None:
+            timings["load"] = time.perf_counter() - start
+
+        for name, stage in self.stages:
+            start = time.perf_counter()
+            gray = stage(gray)
+            if timings is not None:
+                timings[name] = time.perf_counter() - start
+
+        return gray
+
+    __call__ = run
@@ -0,0 +1,148 @@
+"""
+Process-wide OCR engine shared by all Streamlit sessions and reruns
+"""
+import gc
+import os
+import threading
+import time
+
+from .simple_ocr import SimpleOCR, check_dependencies
+
+
+class SharedOCR:
+    """
+    Lazily loaded OCR engine shared across sessions
+
+    Loading EasyOCR takes seconds and hundreds of MB, so one warmed-up engine
+    is kept per process. Calls are serialized because the underlying readers
+    are not safe for concurrent use, and the engine is released after it has
+    been idle for idle_timeout seconds so the memory comes back.
+    """
+
+    def __init__(self, factory=SimpleOCR, idle_timeout: float = 900.0):
+        """
+        Initialize the shared engine holder
+
+        Args:
+            factory: Callable that builds the OCR engine
+            idle_timeout: Seconds of inactivity before the engine is released (0 keeps it forever)
+        """
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self._engine = None
+        self._status = None
+        self._last_used = time.monotonic()
+        self._lock = threading.RLock()
+        self._reaper = None
+        self._warming = False
+
+    def _get_engine(self):
+        """Return the engine, loading it on first use (caller holds the lock)"""
+        if self._engine is None:
+            self._engine = self.factory()
+            if self._status is None:
+                # Tested once per process, here so get_status never needs the lock
+                self._status = self._engine.get_status()
+            self._start_reaper()
+        self._last_used = time.monotonic()
+        return self._engine
+
+    def _start_reaper(self):
+        """Start the background thread that releases the engine when idle"""
+        if self.idle_timeout <= 0 or (self._reaper is not None and self._reaper.is_alive()):
+            return
+
+        def reap():
+            interval = min(60.0, self.idle_timeout / 2)
+            while True:
+                time.sleep(interval)
+                with self._lock:
+                    if self._engine is None:
+                        self._reaper = None
+                        return
+                    if time.monotonic() - self._last_used > self.idle_timeout:
+                        self._release()
+                        self._reaper = None
+                        return
+
+        self._reaper = threading.Thread(target=reap, name="ocr-idle-reaper", daemon=True)
+        self._reaper.start()
+
+    def _release(self):
+        """Drop the engine and reclaim its memory (caller holds the lock)"""
+        self._engine = None
+        gc.collect()
+
+    def release(self):
+        """Release the engine now; it is reloaded on next use"""
+        with self._lock:
+            self._release()
+
+    def load(self):
+        """Load the engine now instead of on the first call"""
+        with self._lock:
+            self._get_engine()
+
+    def warm_up(self):
+        """Load the engine and run a dummy inference so the first real page is fast"""
+        self._warming = True
+        try:
+            with self._lock:
+                engine = self._get_engine()
+                if hasattr(engine, 'warm_up'):
+                    engine.warm_up()
+        finally:
+            self._warming = False
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the engine is currently loaded"""
+        return self._engine is not None
+
+    def extract_text(self, image_input) -> str:
+        """Extract text from one image using the shared engine"""
+        with self._lock:
+            return self._get_engine().extract_text(image_input)
+
+    def extract_text_batch(self, images: list, batch_size: int = 16) -> list:
+        """Extract (text, error) per page, recognizing lines of all pages in shared batches"""
+        with self._lock:
+            return self._get_engine().extract_text_batch(images, batch_size=batch_size)
+
+    def process_multiple_images(self, images: list, **options) -> str:
+        """Extract text from several images using the shared engine"""
+        with self._lock:
+            return self._get_engine().process_multiple_images(images, **options)
+
+    @property
+    def state(self) -> str:
+        """'warming' while warm_up() runs, 'ready' while the engine is loaded, else 'cold'"""
+        if self._warming:
+            return 'warming'
+        return 'ready' if self._engine is not None else 'cold'
+
+    def get_status(self) -> dict:
+        """
+        Get OCR engine status without loading the engine
+
+        Reports installed engines until the engine has been loaded, then the
+        status tested when it was first loaded, along with the engine state.
+        Never takes the lock, so it does not wait for a load or a running job.
+        """
+        state = self.state
+        return {**(self._status or check_dependencies()), 'state': state}
+
+
+_shared_ocr = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_ocr() -> SharedOCR:
+    """Return the process-wide shared OCR engine"""
+    global _shared_ocr
+
+    if _shared_ocr is None:
+        with _shared_lock:
+            if _shared_ocr is None:
+                _shared_ocr = SharedOCR(idle_timeout=float(os.getenv("OCR_IDLE_TIMEOUT_SECONDS", "900")))
+    return _shared_ocr
@@ -1,43 +1,77 @@
 """
 Simplified OCR processor that prioritizes EasyOCR for handwritten text
 """
-from typing import Union, List
+from typing import Union, List, Optional, Tuple
 import io
+import os
+import platform
+import shutil
 
-# Try to import dependencies
-try:
-    from PIL import Image, ImageEnhance, ImageFilter
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
+from .layout import select_text
+from .lazy_imports import is_available, lazy_import
+from .ocr_cache import get_ocr_cache
+from .preprocessing import Preprocessor
+from .tesseract_runner import run_configs_with_boxes
+from .tesserocr_backend import TESSEROCR_AVAILABLE
 
-try:
-    import cv2
-    import numpy as np
-    CV2_AVAILABLE = True
-except ImportError:
-    CV2_AVAILABLE = False
+# Heavy dependencies are imported on first use
+Image = lazy_import("PIL.Image")
+ImageEnhance = lazy_import("PIL.ImageEnhance")
+PIL_AVAILABLE = is_available("PIL")
 
-try:
-    import easyocr
-    EASYOCR_AVAILABLE = True
-except ImportError:
-    EASYOCR_AVAILABLE = False
+cv2 = lazy_import("cv2")
+np = lazy_import("numpy")
+CV2_AVAILABLE = is_available("cv2") and is_available("numpy")
 
-try:
-    import pytesseract
-    import os
-    import platform
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
+easyocr = lazy_import("easyocr")
+EASYOCR_AVAILABLE = is_available("easyocr")
+
+pytesseract = lazy_import("pytesseract")
+TESSERACT_AVAILABLE = is_available("pytesseract")
+
+
+def _find_windows_tesseract() -> Optional[str]:
+    """Path of a Tesseract install in the usual Windows locations, if any"""
+    possible_paths = [
+        r"C:\Program Files\Tesseract-OCR\tesseract.exe",
+        r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
+        r"C:\Users\{}\AppData\Local\Programs\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', '')),
+        r"C:\Tesseract-OCR\tesseract.exe",
+    ]
+    
+    for path in possible_paths:
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def check_dependencies() -> dict:
+    """
+    Get OCR engine status without importing or loading any engine
+    
+    Reports which engines are installed, so it stays cheap enough to call
+    at app startup; SimpleOCR.get_status() tests the loaded engines.
+    """
+    tesseract_binary = shutil.which("tesseract") or (platform.system() == "Windows" and _find_windows_tesseract())
+    return {
+        'easyocr_available': EASYOCR_AVAILABLE,
+        'tesseract_available': TESSEROCR_AVAILABLE or (TESSERACT_AVAILABLE and bool(tesseract_binary)),
+        'pil_available': PIL_AVAILABLE
+    }
 
 
 class SimpleOCR:
     """Simple OCR processor with enhanced preprocessing for better accuracy"""
     
+    # Returned instead of page text when no engine could read the page
+    NO_TEXT_MESSAGES = (
+        "Could not extract text. Please ensure image has clear, readable text.",
+        "No text detected. Please check image quality and ensure text is clearly visible.",
+    )
+    
     def __init__(self):
         self.easyocr_reader = None
+        self.preprocessor = Preprocessor() if CV2_AVAILABLE else None
         
         # Initialize EasyOCR if available
         if EASYOCR_AVAILABLE:
@@ -53,23 +87,18 @@ class SimpleOCR:
     
     def _setup_tesseract_path(self):
         """Setup Tesseract path for Windows"""
-        possible_paths = [
-            r"C:\Program Files\Tesseract-OCR\tesseract.exe",
-            r"C:\Program Files (x86)\Tesseract-OCR\tesseract.exe",
-            r"C:\Users\{}\AppData\Local\Programs\Tesseract-OCR\tesseract.exe".format(os.getenv('USERNAME', '')),
-            r"C:\Tesseract-OCR\tesseract.exe",
-        ]
-        
-        for path in possible_paths:
-            if os.path.isfile(path):
-                pytesseract.pytesseract.tesseract_cmd = path
-                break
+        path = _find_windows_tesseract()
+        if path:
+            pytesseract.pytesseract.tesseract_cmd = path
     
     def enhance_image(self, image: "Image.Image") -> "Image.Image":
         """
         Enhance image for better OCR accuracy
         """
-        # Convert to RGB if needed
+        if self.preprocessor is not None:
+            return Image.fromarray(self.preprocessor.run(image))
+        
+        # Without OpenCV, enhance with PIL only and skip thresholding
         if image.mode != 'RGB':
             image = image.convert('RGB')
         
@@ -90,25 +119,16 @@ class SimpleOCR:
         image = enhancer.enhance(2.0)
         
         # Convert to grayscale for better text recognition
-        image = image.convert('L')
-        
-        # Apply threshold to make text clearer
-        if CV2_AVAILABLE:
-            # Convert PIL to CV2
-            img_array = np.array(image)
-            
-            # Apply Gaussian blur to reduce noise
-            blurred = cv2.GaussianBlur(img_array, (1, 1), 0)
-            
-            # Apply adaptive threshold
-            thresh = cv2.adaptiveThreshold(
-                blurred, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-            )
-            
-            # Convert back to PIL
-            image = Image.fromarray(thresh)
+        return image.convert('L')
+    
+    def _prepare(self, image_input: Union[bytes, "Image.Image", "np.ndarray"]):
+        """Preprocess a page into a grayscale array, or a PIL Image when OpenCV is missing"""
+        if self.preprocessor is not None:
+            return self.preprocessor.run(image_input)
         
-        return image
+        if isinstance(image_input, bytes):
+            image_input = Image.open(io.BytesIO(image_input))
+        return self.enhance_image(image_input)
     
     def extract_text(self, image_input: Union[bytes, "Image.Image"]) -> str:
         """
@@ -117,112 +137,81 @@ class SimpleOCR:
         if not PIL_AVAILABLE:
             raise RuntimeError("PIL (Pillow) required. Install with: pip install pillow")
         
-        # Convert bytes to PIL Image if needed
-        if isinstance(image_input, bytes):
-            image = Image.open(io.BytesIO(image_input))
-        else:
-            image = image_input
+        # Pages read before, including re-encoded copies, come from the cache
+        cache = get_ocr_cache()
+        entry, key = cache.lookup("simple", image_input) if cache is not None else (None, None)
+        if entry is not None:
+            return entry['text']
         
-        # Enhance image for better OCR
-        enhanced_image = self.enhance_image(image)
+        text, boxes = self._extract(image_input)
+        if key is not None and boxes is not None:
+            cache.store(key, text, boxes)
+        return text
+    
+    def _extract(self, image_input: Union[bytes, "Image.Image"]) -> Tuple[str, Optional[list]]:
+        """
+        Run OCR on one page
         
-        # Try EasyOCR first with multiple configurations
+        Returns:
+            (text, boxes the text was built from); boxes is None when no text was
+            found, so the result is not worth caching
+        """
+        # Enhance image for better OCR in a single grayscale pass
+        page = self._prepare(image_input)
+        
+        # Try EasyOCR first
         if self.easyocr_reader is not None:
             try:
-                # Try different EasyOCR parameters for better accuracy
-                
-                # Method 1: Default paragraph mode
-                results1 = self.easyocr_reader.readtext(
-                    np.array(enhanced_image), 
-                    paragraph=True,
-                    width_ths=0.7,
-                    height_ths=0.7
-                )
-                
-                # Method 2: Without paragraph mode for individual words
-                results2 = self.easyocr_reader.readtext(
-                    np.array(enhanced_image),
+                # Run detection and recognition once; both the paragraph and
+                # word layouts are derived from the same boxes
+                results = self.easyocr_reader.readtext(
+                    page,
                     paragraph=False,
                     width_ths=0.7,
                     height_ths=0.7
                 )
                 
-                # Combine results and choose the best one
-                text1 = self._process_easyocr_results(results1)
-                text2 = self._process_easyocr_results(results2)
-                
-                # Choose the longer result (usually more complete)
-                best_text = text1 if len(text1) > len(text2) else text2
+                # Choose the layout with the best confidence-weighted score
+                best_text = select_text(results, confidence_threshold=0.2)
                 
                 if best_text.strip():
-                    return self._clean_text(best_text)
+                    return self._clean_text(best_text), results
                     
             except Exception as e:
                 pass  # Fall back to Tesseract
         
-        # Fall back to Tesseract with multiple configurations
-        if TESSERACT_AVAILABLE:
+        text, boxes = self._fallback_text(page)
+        return text, (None if text in self.NO_TEXT_MESSAGES else boxes)
+    
+    def _fallback_text(self, page) -> Tuple[str, list]:
+        """
+        Extract text and word boxes with Tesseract when EasyOCR found nothing,
+        or explain why there is no text (with no boxes)
+        """
+        # Fall back to Tesseract with multiple concurrent configurations
+        if TESSERACT_AVAILABLE or TESSEROCR_AVAILABLE:
             try:
-                # Convert enhanced image back to RGB for Tesseract
-                if enhanced_image.mode == 'L':
-                    enhanced_image = enhanced_image.convert('RGB')
-                
-                # Try different Tesseract configurations
-                configs = [
-                    '--psm 6 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?;:()[]{}"\'-/\n ',
-                    '--psm 4 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?;:()[]{}"\'-/\n ',
-                    '--psm 3',
-                    '--psm 6'
-                ]
-                
-                best_result = ""
-                for config in configs:
-                    try:
-                        text = pytesseract.image_to_string(enhanced_image, config=config)
-                        if len(text.strip()) > len(best_result.strip()):
-                            best_result = text
-                    except:
-                        continue
+                # All configurations run at once on one temp file; the first
+                # confident result ends the search
+                if not isinstance(page, Image.Image):
+                    page = Image.fromarray(page)
+                best_result, boxes = run_configs_with_boxes(page)
                 
                 if best_result.strip():
-                    return self._clean_text(best_result)
+                    return self._clean_text(best_result), boxes
                     
             except Exception as e:
                 if self.easyocr_reader is not None:
-                    return "Could not extract text. Please ensure image has clear, readable text."
+                    return self.NO_TEXT_MESSAGES[0], []
                 else:
                     raise RuntimeError(f"OCR failed: {str(e)}. Please install EasyOCR with: pip install easyocr")
         
         # No OCR engines available or both failed
         if self.easyocr_reader is not None:
-            return "No text detected. Please check image quality and ensure text is clearly visible."
+            return self.NO_TEXT_MESSAGES[1], []
         else:
             raise RuntimeError("No OCR engines available. Install EasyOCR with: pip install easyocr")
     
-    def _process_easyocr_results(self, results) -> str:
-        """Process EasyOCR results and extract text"""
-        text_parts = []
-        
-        for result in results:
-            try:
-                if len(result) == 3:
-                    # Format: (bbox, text, confidence)
-                    bbox, text, confidence = result
-                    if confidence > 0.2:  # Lower threshold for handwritten text
-                        text_parts.append(text)
-                elif len(result) == 2:
-                    # Format: (bbox, text)
-                    bbox, text = result
-                    text_parts.append(text)
-                else:
-                    # Unknown format
-                    if isinstance(result, (list, tuple)) and len(result) > 1:
-                        text_parts.append(str(result[1]))
-            except:
-                continue
-        
-        return ' '.join(text_parts)
-    
     def _clean_text(self, text: str) -> str:
         """Clean extracted text"""
         if not text:
@@ -239,27 +228,120 @@ class SimpleOCR:
         
         return '\n'.join(cleaned_lines)
     
-    def process_multiple_images(self, images: List[Union[bytes, "Image.Image"]]) -> str:
-        """Process multiple images"""
-        all_text = []
+    def extract_text_batch(self, images: List[Union[bytes, "Image.Image"]],
+                           batch_size: int = 16) -> List[Tuple[str, str]]:
+        """
+        Extract text from several pages, recognizing their lines in shared batches
         
-        for i, image in enumerate(images):
+        Line regions are detected on every page and all crops go through the
+        EasyOCR recognizer together, batch_size lines at a time. Pages with no
+        EasyOCR text fall back to Tesseract as in extract_text.
+        
+        Args:
+            images: Page images (bytes or PIL Images)
+            batch_size: Number of line crops per recognizer batch
+            
+        Returns:
+            (text, error) for each page in page order; error is None on success
+        """
+        if not PIL_AVAILABLE:
+            raise RuntimeError("PIL (Pillow) required. Install with: pip install pillow")
+        
+        pages = [("", None)] * len(images)
+        cache = get_ocr_cache()
+        keys = {}
+        enhanced = {}
+        for i, image_input in enumerate(images):
             try:
-                text = self.extract_text(image)
-                if text.strip():
-                    all_text.append(f"--- Page {i+1} ---\n{text}")
-                else:
-                    all_text.append(f"--- Page {i+1} ---\n[No text detected - please check image quality]")
+                if cache is not None:
+                    entry, keys[i] = cache.lookup("simple", image_input)
+                    if entry is not None:
+                        pages[i] = (entry['text'], None)
+                        continue
+                enhanced[i] = self._prepare(image_input)
             except Exception as e:
-                all_text.append(f"--- Page {i+1} (Error) ---\nFailed to process: {str(e)}")
+                pages[i] = ("", str(e))
+        
+        if self.easyocr_reader is not None and enhanced:
+            try:
+                from .batched_ocr import BatchedRecognizer
+                
+                indexes = list(enhanced)
+                recognizer = BatchedRecognizer(self.easyocr_reader, batch_size=batch_size)
+                page_results = recognizer.recognize_pages([enhanced[i] for i in indexes])
+                
+                for i, results in zip(indexes, page_results):
+                    text = select_text(results, confidence_threshold=0.2)
+                    if text.strip():
+                        pages[i] = (self._clean_text(text), None)
+                        if cache is not None:
+                            cache.store(keys[i], pages[i][0], results)
+            except Exception:
+                pass  # Fall back to Tesseract per page
+        
+        for i, page in enhanced.items():
+            if not pages[i][0]:
+                try:
+                    text, boxes = self._fallback_text(page)
+                    pages[i] = (text, None)
+                    if cache is not None and text not in self.NO_TEXT_MESSAGES:
+                        cache.store(keys[i], text, boxes)
+                except Exception as e:
+                    pages[i] = ("", str(e))
+        
+        return pages
+    
+    def process_multiple_images(self, images: List[Union[bytes, "Image.Image"]], workers: int = 1,
+                                batch_size: int = 0) -> str:
+        """
+        Process multiple images, spreading pages across worker processes if workers > 1,
+        or recognizing their lines in shared batches of batch_size if batch_size > 0
+        """
+        all_text = []
+        
+        if workers > 1 and len(images) > 1:
+            from .parallel_ocr import get_parallel_ocr
+            pages = get_parallel_ocr(workers, "simple").process_pages(images)
+        elif batch_size > 0 and len(images) > 1:
+            pages = self.extract_text_batch(images, batch_size=batch_size)
+        else:
+            pages = []
+            for image in images:
+                try:
+                    pages.append((self.extract_text(image), None))
+                except Exception as e:
+                    pages.append(("", str(e)))
+        
+        for i, (text, error) in enumerate(pages):
+            if error is not None:
+                all_text.append(f"--- Page {i+1} (Error) ---\nFailed to process: {error}")
+            elif text.strip():
+                all_text.append(f"--- Page {i+1} ---\n{text}")
+            else:
+                all_text.append(f"--- Page {i+1} ---\n[No text detected - please check image quality]")
         
         return '\n\n'.join(all_text)
     
+    def warm_up(self):
+        """
+        Run one dummy inference so the first real page does not pay for it
+        
+        torch allocates its buffers and picks kernels on the first forward
+        pass, which takes longer than a typical page. The page is read
+        directly by the reader, so nothing is written to the OCR cache.
+        """
+        if self.easyocr_reader is None or not CV2_AVAILABLE:
+            return
+        
+        page = np.full((64, 320), 255, dtype=np.uint8)
+        cv2.putText(page, "Warm up essay", (8, 44), cv2.FONT_HERSHEY_SIMPLEX, 1.0, 0, 2)
+        self.easyocr_reader.readtext(page)
+    
     def get_status(self) -> dict:
         """Get OCR engine status with actual testing"""
         status = {
             'easyocr_available': self.easyocr_reader is not None,
-            'tesseract_available': False,
+            'tesseract_available': TESSEROCR_AVAILABLE,
             'pil_available': PIL_AVAILABLE
         }
         
@@ -271,6 +353,6 @@ class SimpleOCR:
                 status['tesseract_available'] = True
             except Exception:
                 # Tesseract not working properly
-                status['tesseract_available'] = False
+                status['tesseract_available'] = TESSEROCR_AVAILABLE
         
         return status
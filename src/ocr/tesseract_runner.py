@@ -0,0 +1,184 @@
+"""
+Concurrent Tesseract fallback over several page segmentation configurations
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Tuple
+import os
+import tempfile
+import threading
+
+from .lazy_imports import is_available, lazy_import
+from .tesserocr_backend import TESSEROCR_AVAILABLE, recognize_words
+
+pytesseract = lazy_import("pytesseract")
+TESSERACT_AVAILABLE = is_available("pytesseract")
+
+
+CHAR_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789.,!?;:()[]{}"\'-/\n '
+
+# Fallback configurations, most likely to suit handwritten essay pages first
+TESSERACT_CONFIGS = [
+    f'--psm 6 -c tessedit_char_whitelist={CHAR_WHITELIST}',
+    f'--psm 4 -c tessedit_char_whitelist={CHAR_WHITELIST}',
+    '--psm 3',
+    '--psm 6'
+]
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool; threads wait on tesseract subprocesses or GIL-free tesserocr calls"""
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=int(os.getenv("OCR_TESSERACT_THREADS", str(len(TESSERACT_CONFIGS)))),
+                thread_name_prefix="tesseract"
+            )
+        return _executor
+
+
+def data_to_text(data: dict) -> Tuple[str, float]:
+    """
+    Rebuild text lines from pytesseract.image_to_data output
+
+    Args:
+        data: image_to_data result with Output.DICT
+
+    Returns:
+        (text, mean word confidence from 0 to 100)
+    """
+    lines = {}
+    confidences = []
+
+    for i, word in enumerate(data.get('text', [])):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not word.strip():
+            continue
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines.setdefault(key, []).append(word)
+        confidences.append(confidence)
+
+    text = '\n'.join(' '.join(words) for _, words in sorted(lines.items()))
+    return text, (sum(confidences) / len(confidences) if confidences else 0.0)
+
+
+def data_to_boxes(data: dict) -> List[tuple]:
+    """
+    Word boxes from pytesseract.image_to_data output
+
+    Returns:
+        [(four corner points, word, confidence from 0 to 1)], as EasyOCR reports them
+    """
+    boxes = []
+    for i, word in enumerate(data.get('text', [])):
+        confidence = float(data['conf'][i])
+        if confidence < 0 or not word.strip():
+            continue
+        x_min, y_min = data['left'][i], data['top'][i]
+        x_max, y_max = x_min + data['width'][i], y_min + data['height'][i]
+        boxes.append((
+            [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]],
+            word.strip(),
+            confidence / 100.0
+        ))
+    return boxes
+
+
+def _run_config(source, config: str) -> Tuple[str, float, List[tuple]]:
+    """Run Tesseract on an image file (pytesseract) or a loaded PIL Image (tesserocr) with one configuration"""
+    if not isinstance(source, str):
+        return recognize_words(source, config)
+
+    data = pytesseract.image_to_data(source, config=config, output_type=pytesseract.Output.DICT)
+    return (*data_to_text(data), data_to_boxes(data))
+
+
+def run_configs(image: "Image.Image", configs: List[str] = None, min_confidence: float = 75.0,
+                min_length: int = 400) -> str:
+    """
+    Run Tesseract with several configurations at once and return the best text
+
+    See run_configs_with_boxes() for the arguments.
+    """
+    return run_configs_with_boxes(image, configs, min_confidence, min_length)[0]
+
+
+def run_configs_with_boxes(image: "Image.Image", configs: List[str] = None, min_confidence: float = 75.0,
+                           min_length: int = 400) -> Tuple[str, List[tuple]]:
+    """
+    Run Tesseract with several configurations at once and return the best text with its word boxes
+
+    With tesserocr installed each run recognizes the image in-process on
+    its thread's API handle; otherwise the image is written to a temporary
+    file once and shared by all pytesseract runs.
+    As soon as one run reaches min_confidence or min_length its text is
+    returned without waiting for the others; otherwise the longest text wins,
+    as when the configurations ran one after another.
+
+    Args:
+        image: PIL Image to recognize
+        configs: Tesseract configurations (defaults to TESSERACT_CONFIGS)
+        min_confidence: Mean word confidence (0-100) that ends the search early
+        min_length: Text length that ends the search early
+
+    Returns:
+        (extracted text, empty if no configuration found any;
+         word boxes of the run the text came from)
+    """
+    if not TESSERACT_AVAILABLE and not TESSEROCR_AVAILABLE:
+        raise RuntimeError("Tesseract not available. Install with: pip install pytesseract")
+
+    configs = configs or TESSERACT_CONFIGS
+
+    executor = _get_executor()
+
+    if TESSEROCR_AVAILABLE:
+        # Decode once up front so the threads only read the pixel data
+        image.load()
+        futures = [executor.submit(_run_config, image, config) for config in configs]
+    else:
+        handle, path = tempfile.mkstemp(prefix="tess_", suffix=".png")
+        os.close(handle)
+        image.save(path, format="PNG")
+        futures = [executor.submit(_run_config, path, config) for config in configs]
+
+        # The file is removed once the last run is done, even after an early return
+        remaining = [len(futures)]
+        remaining_lock = threading.Lock()
+
+        def release(_):
+            with remaining_lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+
+        for future in futures:
+            future.add_done_callback(release)
+
+    best_result, best_boxes = "", []
+    errors = []
+    for future in as_completed(futures):
+        try:
+            text, confidence, boxes = future.result()
+        except Exception as e:
+            errors.append(e)
+            continue
+
+        if text.strip() and (confidence >= min_confidence or len(text.strip()) >= min_length):
+            for pending in futures:
+                pending.cancel()
+            return text, boxes
+
+        if len(text.strip()) > len(best_result.strip()):
+            best_result, best_boxes = text, boxes
+
+    if not best_result.strip() and len(errors) == len(futures):
+        raise errors[0]
+    return best_result, best_boxes
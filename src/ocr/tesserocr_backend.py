@@ -0,0 +1,111 @@
+"""
+In-process Tesseract backend using the tesserocr binding
+"""
+from typing import List, Tuple
+import re
+import threading
+
+from .lazy_imports import is_available, lazy_import
+
+tesserocr = lazy_import("tesserocr")
+TESSEROCR_AVAILABLE = is_available("tesserocr")
+
+
+# One API handle per worker thread, keyed by OCR engine mode; Tesseract handles
+# are not thread-safe but can be reused for any number of pages and configs
+_local = threading.local()
+
+_PSM_PATTERN = re.compile(r'--psm\s+(\d+)')
+_OEM_PATTERN = re.compile(r'--oem\s+(\d+)')
+_VARIABLE_PATTERN = re.compile(r'-c\s+(\w+)=(.*?)(?=\s+-c\s|\s+--|\Z)', re.DOTALL)
+
+# Variables a config may set; reset on reuse so one config does not leak into the next
+_RESETTABLE_VARIABLES = {"tessedit_char_whitelist": ""}
+
+
+def parse_config(config: str) -> Tuple[int, int, dict]:
+    """
+    Parse a pytesseract config string
+
+    Args:
+        config: Config such as '--oem 3 --psm 6 -c tessedit_char_whitelist=abc'
+
+    Returns:
+        (page segmentation mode, OCR engine mode, variables)
+    """
+    psm = _PSM_PATTERN.search(config)
+    oem = _OEM_PATTERN.search(config)
+    variables = dict(_VARIABLE_PATTERN.findall(config))
+    return (
+        int(psm.group(1)) if psm else 3,
+        int(oem.group(1)) if oem else 3,
+        variables
+    )
+
+
+def get_api(oem: int = 3) -> "tesserocr.PyTessBaseAPI":
+    """Return this thread's Tesseract API handle, loading the language data on first use"""
+    if not TESSEROCR_AVAILABLE:
+        raise RuntimeError("tesserocr not available. Install with: pip install tesserocr")
+
+    handles = getattr(_local, "handles", None)
+    if handles is None:
+        handles = _local.handles = {}
+
+    if oem not in handles:
+        handles[oem] = tesserocr.PyTessBaseAPI(lang="eng", oem=oem)
+    return handles[oem]
+
+
+def recognize(image: "Image.Image", config: str = "") -> Tuple[str, float]:
+    """
+    Recognize an image in-process with this thread's Tesseract handle
+
+    Args:
+        image: PIL Image to recognize
+        config: pytesseract-style config string (--psm, --oem and -c variables)
+
+    Returns:
+        (text, mean word confidence from 0 to 100)
+    """
+    text, confidence, _ = recognize_words(image, config)
+    return text, confidence
+
+
+def recognize_words(image: "Image.Image", config: str = "") -> Tuple[str, float, List[tuple]]:
+    """
+    Recognize an image like recognize(), also returning each word's box
+
+    Returns:
+        (text, mean word confidence from 0 to 100,
+         [(four corner points, word, confidence from 0 to 1)])
+    """
+    psm, oem, variables = parse_config(config)
+    api = get_api(oem)
+
+    for name, value in {**_RESETTABLE_VARIABLES, **variables}.items():
+        api.SetVariable(name, value)
+    api.SetPageSegMode(psm)
+    api.SetImage(image)
+
+    try:
+        api.Recognize()
+        text, confidence = api.GetUTF8Text(), float(api.MeanTextConf())
+
+        words = []
+        iterator = api.GetIterator()
+        if iterator is not None:
+            for word in tesserocr.iterate_level(iterator, tesserocr.RIL.WORD):
+                word_text = word.GetUTF8Text(tesserocr.RIL.WORD)
+                bounds = word.BoundingBox(tesserocr.RIL.WORD)
+                if not word_text or not word_text.strip() or bounds is None:
+                    continue
+                x_min, y_min, x_max, y_max = bounds
+                words.append((
+                    [[x_min, y_min], [x_max, y_min], [x_max, y_max], [x_min, y_max]],
+                    word_text.strip(),
+                    word.Confidence(tesserocr.RIL.WORD) / 100.0
+                ))
+        return text, confidence, words
+    finally:
+        api.Clear()
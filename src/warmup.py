@@ -0,0 +1,154 @@
+"""
+Background warm-up of the OCR engine and the evaluation workflow
+
+The first OCR request after a start pays for loading EasyOCR and torch's
+first inference, and the first evaluation for importing LangChain and
+compiling the LangGraph workflows. Warm-up does that work in a daemon
+thread at startup and records the state of each step, so the app can show
+real readiness instead of whether an import worked.
+"""
+from enum import Enum
+from typing import Callable, List, Optional, Tuple
+import importlib
+import os
+import threading
+import time
+
+
+class WarmupState(Enum):
+    """State of one warm-up step"""
+    PENDING = "pending"
+    WARMING = "warming"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class Warmup:
+    """
+    Runs warm-up steps one after another in a background thread
+
+    Steps run in order so they do not compete for CPU with each other; a
+    failing step is recorded and the remaining steps still run. Requests
+    arriving meanwhile are not blocked by the warm-up itself, only by the
+    locks of whatever it is loading, so they never load anything twice.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], None]]]):
+        """
+        Initialize the warm-up
+
+        Args:
+            steps: (name, callable) pairs run in order
+        """
+        self.steps = list(steps)
+        self._states = {name: {'state': WarmupState.PENDING, 'seconds': None, 'error': None}
+                        for name, _ in self.steps}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._done = threading.Event()
+
+    def start(self) -> "Warmup":
+        """Start the warm-up thread (once)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+                self._thread.start()
+        return self
+
+    def _run(self):
+        for name, step in self.steps:
+            self._update(name, state=WarmupState.WARMING)
+            start = time.perf_counter()
+            try:
+                step()
+                self._update(name, state=WarmupState.READY, seconds=time.perf_counter() - start)
+            except Exception as e:
+                self._update(name, state=WarmupState.FAILED, seconds=time.perf_counter() - start, error=str(e))
+        self._done.set()
+
+    def _update(self, name: str, **fields):
+        with self._lock:
+            self._states[name].update(fields)
+
+    def state(self, name: str) -> WarmupState:
+        """Return the state of one step"""
+        with self._lock:
+            return self._states[name]['state']
+
+    def status(self) -> dict:
+        """Return each step's state value, duration in seconds and error"""
+        with self._lock:
+            return {
+                name: {**entry, 'state': entry['state'].value}
+                for name, entry in self._states.items()
+            }
+
+    @property
+    def is_done(self) -> bool:
+        """Whether every step has finished, successfully or not"""
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait for the warm-up to finish, returning whether it did"""
+        return self._done.wait(timeout)
+
+
+def _warm_llm():
+    """Import the LLM client stack and create the pooled client for the configured key"""
+    # Importing llm_config also loads .env, so read the key afterwards
+    from .models.llm_config import get_llm_model
+
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if api_key:
+        get_llm_model(api_key)
+    else:
+        # The key comes from the sidebar; importing is the slow part of building a client
+        importlib.import_module("langchain_openai")
+
+
+def _warm_workflow():
+    """Compile the evaluation workflow for every mode"""
+    from .workflow import WorkflowMode, get_workflow
+    for mode in WorkflowMode:
+        get_workflow(mode)
+
+
+_warmup = None
+_warmup_lock = threading.Lock()
+
+
+def get_warmup() -> Optional[Warmup]:
+    """Return the process-wide warm-up, or None if it was not started"""
+    return _warmup
+
+
+def start_warmup(ocr_engine=None, ocr_pool=None) -> Optional[Warmup]:
+    """
+    Start the process-wide warm-up (once per process)
+
+    Args:
+        ocr_engine: Engine with a warm_up() method (e.g. the shared OCR engine),
+            or None to skip OCR warm-up
+        ocr_pool: Parallel OCR pool whose worker processes are started and
+            warmed up too, or None when pages are not OCR'd in parallel
+
+    Returns:
+        The running warm-up, or None if disabled with WARMUP_ENABLED=0
+    """
+    global _warmup
+
+    if os.getenv("WARMUP_ENABLED", "1") == "0":
+        return None
+
+    if _warmup is None:
+        with _warmup_lock:
+            if _warmup is None:
+                steps = []
+                if ocr_engine is not None and hasattr(ocr_engine, 'warm_up'):
+                    steps.append(('ocr', ocr_engine.warm_up))
+                if ocr_pool is not None:
+                    steps.append(('ocr_workers', ocr_pool.warm_up))
+                steps.append(('llm', _warm_llm))
+                steps.append(('workflow', _warm_workflow))
+                _warmup = Warmup(steps).start()
+    return _warmup
@@ -1,3 +1,36 @@
-from .essay_workflow import create_workflow, evaluate_essay
+import importlib
 
-__all__ = ['create_workflow', 'evaluate_essay']
+# Public name -> submodule defining it; submodules are imported on first
+# access so WorkflowMode can be used without loading LangGraph
+_EXPORTS = {
+    'WorkflowMode': 'modes',
+    'create_workflow': 'essay_workflow',
+    'create_fused_workflow': 'essay_workflow',
+    'evaluate_essay': 'essay_workflow',
+    'aevaluate_essay': 'essay_workflow',
+    'astream_evaluation': 'essay_workflow',
+    'stream_evaluation': 'essay_workflow',
+    'get_workflow': 'essay_workflow',
+    'invalidate_workflow_cache': 'essay_workflow',
+    'register_evaluator': 'essay_workflow',
+    'unregister_evaluator': 'essay_workflow',
+    'run_sync': 'event_loop',
+    'iterate_sync': 'event_loop',
+    'batch_evaluate': 'batch',
+    'abatch_evaluate': 'batch',
+    'load_essays': 'batch'
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
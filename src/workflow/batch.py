@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import time
+
+from ..models import background_requests
+from .essay_workflow import WorkflowMode, aevaluate_essay
+from .event_loop import run_sync
+
+
+def load_essays(source: str) -> list:
+    """
+    Load essays from a directory of text files or a JSONL file
+
+    Args:
+        source: Directory containing .txt files, or a .jsonl file whose lines
+            contain an "essay" field and an optional "id" field
+
+    Returns:
+        List of {"id", "essay"} dictionaries in a stable order
+    """
+    essays = []
+
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if not filename.lower().endswith('.txt'):
+                continue
+            with open(os.path.join(source, filename), encoding='utf-8') as f:
+                essays.append({'id': os.path.splitext(filename)[0], 'essay': f.read()})
+    else:
+        with open(source, encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if 'essay' not in record:
+                    raise ValueError(f"Line {line_number} of {source} has no 'essay' field")
+                essays.append({'id': str(record.get('id', line_number)), 'essay': record['essay']})
+
+    return essays
+
+
+def load_completed_ids(output_path: str) -> set:
+    """Return the ids of essays already evaluated successfully in an output file"""
+    completed = set()
+
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            if record.get('status') == 'ok':
+                completed.add(record['id'])
+
+    return completed
+
+
+def truncate_partial_line(output_path: str, chunk_size: int = 65536):
+    """
+    Cut an output file back to its last complete line
+
+    An interrupted run can leave a last line without its newline; appending
+    after it would join the next record onto that line and corrupt both.
+
+    Args:
+        output_path: JSONL file to repair in place (ignored if missing)
+        chunk_size: Bytes read at a time while searching backwards for a newline
+    """
+    if not os.path.exists(output_path):
+        return
+
+    with open(output_path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            position = start
+        else:
+            keep = 0
+
+        if keep < end:
+            f.truncate(keep)
+
+
+def percentile(values: list, pct: float) -> float:
+    """Return the pct-th percentile of values using linear interpolation"""
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+async def abatch_evaluate(essays: list, api_key: str, output_path: str, concurrency: int = 4,
+                          mode: WorkflowMode = WorkflowMode.FANOUT, resume: bool = True) -> dict:
+    """
+    Evaluate many essays with bounded concurrency, streaming results to JSONL
+
+    Args:
+        essays: List of {"id", "essay"} dictionaries
+        api_key: OpenRouter API key
+        output_path: JSONL file that receives one record per finished essay
+        concurrency: Maximum number of essays evaluated at once
+        mode: Workflow mode used for every essay
+        resume: Skip essays already recorded as successful in output_path
+
+    Returns:
+        Run statistics (counts, throughput and latency percentiles)
+
+    Raises:
+        ValueError: If concurrency is below 1, which would never start an essay
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+
+    completed = load_completed_ids(output_path) if resume else set()
+    if resume:
+        truncate_partial_line(output_path)
+    pending = [essay for essay in essays if essay['id'] not in completed]
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failed = 0
+
+    with open(output_path, 'a' if resume else 'w', encoding='utf-8') as output:
+        async def evaluate_one(item: dict):
+            nonlocal failed
+
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    result = await aevaluate_essay(item['essay'], api_key, mode)
+                    record = {
+                        'id': item['id'],
+                        'status': 'ok',
+                        'result': {k: v for k, v in result.items() if k not in ('essay', 'api_key')}
+                    }
+                except Exception as e:
+                    failed += 1
+                    record = {'id': item['id'], 'status': 'error', 'error': str(e)}
+                latency = time.perf_counter() - start
+
+            if record['status'] == 'ok':
+                latencies.append(latency)
+            record['latency_seconds'] = round(latency, 3)
+
+            # Flush each record so an interrupted run can resume from here
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+
+        start = time.perf_counter()
+        # Batch calls yield to interactive users sharing the same API key
+        with background_requests():
+            await asyncio.gather(*(evaluate_one(item) for item in pending))
+        elapsed = time.perf_counter() - start
+
+    return {
+        'total': len(essays),
+        'skipped': len(essays) - len(pending),
+        'evaluated': len(pending) - failed,
+        'failed': failed,
+        'elapsed_seconds': elapsed,
+        # Failed essays often fail fast, so counting them would inflate throughput
+        'throughput_per_minute': (len(latencies) / elapsed * 60) if elapsed > 0 else 0.0,
+        'p50_latency_seconds': percentile(latencies, 50),
+        'p95_latency_seconds': percentile(latencies, 95)
+    }
+
+
+def batch_evaluate(essays: list, api_key: str, output_path: str, concurrency: int = 4,
+                   mode: WorkflowMode = WorkflowMode.FANOUT, resume: bool = True) -> dict:
+    """Evaluate many essays with bounded concurrency (see abatch_evaluate)"""
+    return run_sync(abatch_evaluate(essays, api_key, output_path, concurrency, mode, resume))
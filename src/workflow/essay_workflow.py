@@ -1,41 +1,248 @@
+import threading
+
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
-from ..models import UPSCState
-from ..evaluators import evaluate_language, evaluate_analysis, evaluate_thought, final_evaluation
+from ..models import UPSCState, get_evaluation_cache, make_cache_key, extract_json, StructuredOutputError
+from ..evaluators import (
+    evaluate_language, evaluate_analysis, evaluate_thought, final_evaluation, evaluate_fused,
+    aevaluate_language, aevaluate_analysis, aevaluate_thought, afinal_evaluation, aevaluate_fused
+)
+from .event_loop import run_sync, iterate_sync
+from .modes import WorkflowMode
+
+
+# Evaluator nodes (sync, async) that run in parallel before the final evaluation
+EVALUATOR_NODES = {
+    'evaluate_language': (evaluate_language, aevaluate_language),
+    'evaluate_analysis': (evaluate_analysis, aevaluate_analysis),
+    'evaluate_thought': (evaluate_thought, aevaluate_thought),
+}
+
+# Process-wide cache of compiled workflows, one per mode
+_compiled_workflows = {}
+_workflow_lock = threading.Lock()
 
 
-def create_workflow():
+def _as_node(name: str, node, anode=None):
+    """Wrap a node so the compiled graph supports both invoke and ainvoke"""
+    if anode is None:
+        return node
+    return RunnableLambda(node, afunc=anode, name=name)
+
+
+def create_workflow(mode: WorkflowMode = WorkflowMode.FANOUT):
     """Create and compile the UPSC essay evaluation workflow"""
+    if mode == WorkflowMode.FUSED:
+        return create_fused_workflow()
+
     graph = StateGraph(UPSCState)
 
     # Add nodes
-    graph.add_node('evaluate_language', evaluate_language)
-    graph.add_node('evaluate_analysis', evaluate_analysis)
-    graph.add_node('evaluate_thought', evaluate_thought)
-    graph.add_node('final_evaluation', final_evaluation)
+    for name, (node, anode) in EVALUATOR_NODES.items():
+        graph.add_node(name, _as_node(name, node, anode))
+    graph.add_node('final_evaluation', _as_node('final_evaluation', final_evaluation, afinal_evaluation))
 
     # Add edges - parallel execution for evaluation nodes
-    graph.add_edge(START, 'evaluate_language')
-    graph.add_edge(START, 'evaluate_analysis')
-    graph.add_edge(START, 'evaluate_thought')
+    for name in EVALUATOR_NODES:
+        graph.add_edge(START, name)
 
     # All evaluations feed into final evaluation
-    graph.add_edge('evaluate_language', 'final_evaluation')
-    graph.add_edge('evaluate_analysis', 'final_evaluation')
-    graph.add_edge('evaluate_thought', 'final_evaluation')
+    for name in EVALUATOR_NODES:
+        graph.add_edge(name, 'final_evaluation')
     graph.add_edge('final_evaluation', END)
 
     # Compile and return the workflow
     return graph.compile()
 
 
-def evaluate_essay(essay_text: str, api_key: str):
-    """Evaluate an essay using the workflow"""
-    workflow = create_workflow()
-    
+def create_fused_workflow():
+    """Create and compile the single-call (fused) evaluation workflow"""
+    graph = StateGraph(UPSCState)
+
+    graph.add_node('evaluate_fused', _as_node('evaluate_fused', evaluate_fused, aevaluate_fused))
+    graph.add_edge(START, 'evaluate_fused')
+    graph.add_edge('evaluate_fused', END)
+
+    return graph.compile()
+
+
+def get_workflow(mode: WorkflowMode = WorkflowMode.FANOUT):
+    """Return the compiled workflow for a mode, building it on first use"""
+    workflow = _compiled_workflows.get(mode)
+
+    if workflow is None:
+        with _workflow_lock:
+            workflow = _compiled_workflows.get(mode)
+            if workflow is None:
+                workflow = create_workflow(mode)
+                _compiled_workflows[mode] = workflow
+    return workflow
+
+
+def invalidate_workflow_cache():
+    """Drop the compiled workflows so the next request rebuilds them"""
+    with _workflow_lock:
+        _compiled_workflows.clear()
+
+
+def register_evaluator(name: str, node, anode=None):
+    """Add or replace an evaluator node and invalidate the compiled workflow"""
+    EVALUATOR_NODES[name] = (node, anode)
+    invalidate_workflow_cache()
+
+
+def unregister_evaluator(name: str):
+    """Remove an evaluator node and invalidate the compiled workflow"""
+    EVALUATOR_NODES.pop(name, None)
+    invalidate_workflow_cache()
+
+
+# Feedback fields written by each streaming node; evaluator nodes reply in JSON
+_STREAMED_FIELDS = {
+    'evaluate_language': {'language_feedback': ('feedback',)},
+    'evaluate_analysis': {'analysis_feedback': ('feedback',)},
+    'evaluate_thought': {'clarity_feedback': ('feedback',)},
+    'evaluate_fused': {
+        'language_feedback': ('language', 'feedback'),
+        'analysis_feedback': ('analysis', 'feedback'),
+        'clarity_feedback': ('clarity', 'feedback'),
+        'overall_feedback': ('overall_feedback',)
+    },
+}
+
+
+def _get_cached_result(mode: WorkflowMode, essay_text: str, api_key: str):
+    """Return the cache, the essay's cache key and any cached result"""
+    cache = get_evaluation_cache()
+    # Registering or removing an evaluator changes the fan-out result; the fused mode does not use them
+    extra = {} if mode == WorkflowMode.FUSED else {'evaluators': sorted(EVALUATOR_NODES)}
+    cache_key = make_cache_key(f'evaluate_essay:{mode.value}', essay_text, extra)
+    if cache is None:
+        return None, cache_key, None
+
+    cached = cache.get(cache_key)
+    if cached is not None:
+        cached = {**cached, 'essay': essay_text, 'api_key': api_key}
+    return cache, cache_key, cached
+
+
+def _cache_result(cache, cache_key: str, result: dict):
+    """Store a finished evaluation unless it is degraded"""
+    # Degraded results are returned but never cached
+    if cache is not None and not result.get('degraded_nodes'):
+        # Never persist the API key
+        cache.set(cache_key, {k: v for k, v in result.items() if k not in ('essay', 'api_key')})
+
+
+def _chunk_text(chunk) -> str:
+    """Return the text carried by a streamed message chunk, including tool call arguments"""
+    tool_call_chunks = getattr(chunk, 'tool_call_chunks', None)
+    if tool_call_chunks:
+        return ''.join(call.get('args') or '' for call in tool_call_chunks)
+    return chunk.content if isinstance(chunk.content, str) else ''
+
+
+def _partial_feedback(node: str, text: str) -> dict:
+    """Map a node's partial output to the feedback fields it fills"""
+    if node == 'final_evaluation':
+        return {'overall_feedback': text}
+
+    fields = _STREAMED_FIELDS.get(node)
+    if not fields:
+        return {}
+
+    try:
+        # The reply is still streaming in, so close its open strings and brackets
+        data = extract_json(text, allow_partial=True)
+    except StructuredOutputError:
+        return {}
+
+    partial = {}
+    for field, path in fields.items():
+        value = data
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(value, str) and value:
+            partial[field] = value
+    return partial
+
+
+async def aevaluate_essay(essay_text: str, api_key: str, mode: WorkflowMode = WorkflowMode.FANOUT):
+    """Evaluate an essay using the workflow without blocking the event loop"""
+    mode = WorkflowMode(mode)
+
+    # Serve identical essays from the result cache
+    cache, cache_key, cached = _get_cached_result(mode, essay_text, api_key)
+    if cached is not None:
+        return cached
+
+    workflow = get_workflow(mode)
+
     initial_state = {
         'essay': essay_text,
         'api_key': api_key
     }
-    
-    result = workflow.invoke(initial_state)
+
+    result = await workflow.ainvoke(initial_state)
+
+    _cache_result(cache, cache_key, result)
     return result
+
+
+async def astream_evaluation(essay_text: str, api_key: str, mode: WorkflowMode = WorkflowMode.FANOUT):
+    """
+    Evaluate an essay, yielding feedback as the model generates it
+
+    Yields:
+        ("partial", {field: text}) with the feedback generated so far for
+        one or more fields, then ("result", state) with the final result
+    """
+    mode = WorkflowMode(mode)
+
+    cache, cache_key, cached = _get_cached_result(mode, essay_text, api_key)
+    if cached is not None:
+        yield 'result', cached
+        return
+
+    workflow = get_workflow(mode)
+
+    initial_state = {
+        'essay': essay_text,
+        'api_key': api_key
+    }
+
+    # Text accumulated per (node, message id); a hedged duplicate or a re-ask
+    # streams under its own id, and the most complete one is shown
+    buffers = {}
+    result = None
+
+    async for stream_mode, chunk in workflow.astream(initial_state, stream_mode=["messages", "values"]):
+        if stream_mode == "values":
+            result = chunk
+            continue
+
+        message, metadata = chunk
+        node = metadata.get('langgraph_node')
+        text = _chunk_text(message)
+        if not node or not text:
+            continue
+
+        key = (node, message.id)
+        buffers[key] = buffers.get(key, '') + text
+        longest = max((value for (name, _), value in buffers.items() if name == node), key=len)
+        partial = _partial_feedback(node, longest)
+        if partial:
+            yield 'partial', partial
+
+    _cache_result(cache, cache_key, result)
+    yield 'result', result
+
+
+def stream_evaluation(essay_text: str, api_key: str, mode: WorkflowMode = WorkflowMode.FANOUT):
+    """Synchronous generator over astream_evaluation events"""
+    return iterate_sync(astream_evaluation(essay_text, api_key, mode))
+
+
+def evaluate_essay(essay_text: str, api_key: str, mode: WorkflowMode = WorkflowMode.FANOUT):
+    """Evaluate an essay using the workflow"""
+    return run_sync(aevaluate_essay(essay_text, api_key, mode))
@@ -0,0 +1,77 @@
+import asyncio
+import queue
+import threading
+
+
+# Background event loop used to run async evaluations from synchronous callers
+_loop = None
+_loop_thread = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting it on first use"""
+    global _loop, _loop_thread
+
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="evaluation-event-loop", daemon=True)
+                thread.start()
+                _loop, _loop_thread = loop, thread
+    return _loop
+
+
+def run_sync(coro):
+    """
+    Run a coroutine on the shared background loop and wait for its result
+
+    Reusing one long-lived loop keeps async HTTP connections in the pooled
+    LLM clients valid between calls, which a fresh asyncio.run() would not.
+    """
+    loop = get_event_loop()
+
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("run_sync() cannot be called from the evaluation event loop; await the coroutine instead")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def iterate_sync(agen):
+    """
+    Iterate an async generator from synchronous code
+
+    The generator runs on the shared background loop and its items are
+    handed over through a queue as soon as they are produced.
+    """
+    loop = get_event_loop()
+
+    if threading.current_thread() is _loop_thread:
+        raise RuntimeError("iterate_sync() cannot be called from the evaluation event loop; use async for instead")
+
+    items = queue.Queue()
+    finished = object()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((item, None))
+        except BaseException as e:
+            items.put((None, e))
+        else:
+            items.put((finished, None))
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is finished:
+                return
+            yield item
+    finally:
+        # Stop the producer if the consumer stops early
+        future.cancel()
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class WorkflowMode(Enum):
+    """Available evaluation workflow modes"""
+    FANOUT = "fanout"  # One call per rubric dimension plus a summary call
+    FUSED = "fused"    # All dimensions and the summary in a single call